@@ -4,7 +4,9 @@ Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
 import argparse
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import process_data
@@ -23,8 +25,128 @@ def set_seed(seed: int) -> None:
     np.random.seed(seed)
 
 
-if __name__ == "__main__":
+def build_processor(
+    dataset_type: str,
+    dataset_dir: str,
+    k_core: int = 5,
+    sample_user_size: int = None,
+) -> process_data.BaseDatasetProcessor:
+    r"""Build the dataset processor of the given dataset type.
+
+    Args:
+        dataset_type (str):
+            The type of the dataset, e.g., ``amazon`` or ``douban``.
+        dataset_dir (str):
+            The directory of the dataset.
+        k_core (int, optional, default=5):
+            The K-core value for filtering out inactive users and items.
+        sample_user_size (int, optional, default=None):
+            The number of users to sample from the dataset.
+
+    Returns:
+        process_data.BaseDatasetProcessor:
+            The dataset processor.
+    """
+    if dataset_type == "amazon":
+        processor = process_data.AmazonDatasetProcessor(
+            dataset_dir=dataset_dir,
+            meta_available=True,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "douban":
+        processor = process_data.DoubanDatasetProcessor(
+            dataset_dir=dataset_dir,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "food":
+        processor = process_data.FoodDatasetProcessor(
+            dataset_dir=dataset_dir,
+            meta_available=True,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "gowalla":
+        processor = process_data.GowallaDatasetProcessor(
+            dataset_dir=dataset_dir,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "kuairec":
+        processor = process_data.KuaiRecDatasetProcessor(
+            dataset_dir=dataset_dir,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "movielens":
+        processor = process_data.MovielensDatasetProcessor(
+            dataset_dir=dataset_dir,
+            meta_available=True,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "retailrocket":
+        processor = process_data.RetailRocketDatasetProcessor(
+            dataset_dir=dataset_dir,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "steam":
+        processor = process_data.SteamDatasetProcessor(
+            dataset_dir=dataset_dir,
+            meta_available=True,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "yelp":
+        processor = process_data.YelpDatasetProcessor(
+            dataset_dir=dataset_dir,
+            meta_available=True,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    elif dataset_type == "yoochoose":
+        processor = process_data.YooChooseDatasetProcessor(
+            dataset_dir=dataset_dir,
+            k_core=k_core,
+            sample_user_size=sample_user_size,
+        )
+    else:
+        raise ValueError(f"Unsupported dataset type: {dataset_type}")
+    return processor
+
+
+def run_processor(
+    dataset_type: str,
+    dataset_dir: str,
+    k_core: int = 5,
+    sample_user_size: int = None,
+) -> str:
+    r"""Build and run the dataset processor of the given dataset type. The
+    random seed is reset before processing, so that the result does not depend
+    on whether the dataset is processed alone or in a worker process.
+
+    Args:
+        dataset_type (str):
+            The type of the dataset, e.g., ``amazon`` or ``douban``.
+        dataset_dir (str):
+            The directory of the dataset.
+        k_core (int, optional, default=5):
+            The K-core value for filtering out inactive users and items.
+        sample_user_size (int, optional, default=None):
+            The number of users to sample from the dataset.
+
+    Returns:
+        str:
+            The directory of the processed dataset.
+    """
     set_seed(42)
+    build_processor(dataset_type, dataset_dir, k_core, sample_user_size).process()
+    return dataset_dir
+
+
+if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process SeqRec datasets.")
     parser.add_argument(
         "--dataset-type",
@@ -41,14 +163,18 @@ if __name__ == "__main__":
             "yelp",
             "yoochoose",
         ],
+        nargs="+",
         required=True,
-        help="The type of the dataset to process.",
+        help="The type of the dataset to process. Either one type for all the "
+        "datasets, or one type for each dataset in --dataset-dir.",
     )
     parser.add_argument(
         "--dataset-dir",
         type=str,
+        nargs="+",
         required=True,
-        help="The directory of the dataset.",
+        help="The directory of the dataset. Multiple datasets are processed "
+        "in parallel worker processes.",
     )
     parser.add_argument(
         "--k-core",
@@ -62,72 +188,28 @@ if __name__ == "__main__":
         default=None,
         help="The number of users to sample from the dataset.",
     )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=None,
+        help="The maximum number of worker processes when processing multiple "
+        "datasets, defaults to the number of CPUs.",
+    )
     args = parser.parse_args()
-    if args.dataset_type == "amazon":
-        processor = process_data.AmazonDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            meta_available=True,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "douban":
-        processor = process_data.DoubanDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "food":
-        processor = process_data.FoodDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            meta_available=True,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "gowalla":
-        processor = process_data.GowallaDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "kuairec":
-        processor = process_data.KuaiRecDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "movielens":
-        processor = process_data.MovielensDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            meta_available=True,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "retailrocket":
-        processor = process_data.RetailRocketDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "steam":
-        processor = process_data.SteamDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            meta_available=True,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "yelp":
-        processor = process_data.YelpDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            meta_available=True,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
-    elif args.dataset_type == "yoochoose":
-        processor = process_data.YooChooseDatasetProcessor(
-            dataset_dir=args.dataset_dir,
-            k_core=args.k_core,
-            sample_user_size=args.sample_user_size,
-        )
+    if len(args.dataset_type) == 1:
+        args.dataset_type = args.dataset_type * len(args.dataset_dir)
+    if len(args.dataset_type) != len(args.dataset_dir):
+        parser.error("--dataset-type must be given once or once per --dataset-dir")
+    jobs = [
+        (dataset_type, dataset_dir, args.k_core, args.sample_user_size)
+        for dataset_type, dataset_dir in zip(args.dataset_type, args.dataset_dir)
+    ]
+    if len(jobs) == 1:
+        run_processor(*jobs[0])
     else:
-        raise ValueError(f"Unsupported dataset type: {args.dataset_type}")
-    processor.process()
+        # the datasets are independent and CPU-bound, so each one is processed
+        # in its own process instead of sequentially
+        num_workers = min(len(jobs), args.num_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            for dataset_dir in executor.map(run_processor, *zip(*jobs)):
+                print(f"Processed {dataset_dir}")
@@ -3,12 +3,12 @@ r"""Amazon Dataset Processor for SeqRecBenchmark.
 Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
-import ast
 import os
 
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
+from process_data.io import read_literal_json
 
 __all__ = [
     "AmazonDatasetProcessor",
@@ -37,28 +37,16 @@ def read_json(
             row will be dropped.
         standard (bool, optional, default=True):
             Whether the file is in the standard JSON format. If ``False``,
-            we assume that each row is a Python literal (e.g., a dictionary).
-            The default value is ``True``.
+            we assume that each row is a Python literal (e.g., a dictionary),
+            which is parsed by :func:`read_literal_json`. The default value is
+            ``True``.
 
     Returns:
         The DataFrame containing the data from the JSON file.
     """
-    if standard:
-        df = pd.read_json(file_path, lines=True)
-    else:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        data = []
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data.append(ast.literal_eval(line))
-            except Exception as error:
-                print(f"Error parsing line: {line}")
-                print(f"Error message: {error}")
-        df = pd.DataFrame(data)
+    if not standard:
+        return read_literal_json(file_path, selected_cols)
+    df = pd.read_json(file_path, lines=True)
     if selected_cols is not None:
         df = df[selected_cols]
     df = df.dropna()
@@ -138,6 +126,19 @@ class AmazonDatasetProcessor(BaseDatasetProcessor):
                 f"specify the version of the Amazon dataset (2014 or 2018)."
             )
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        raw_files = [os.path.join(raw_dir, f"reviews_{self.dataset_name}.json")]
+        if self.meta_available:
+            raw_files.append(os.path.join(raw_dir, f"meta_{self.dataset_name}.json"))
+        return raw_files
+
     def _load_data(self) -> tuple[pd.DataFrame, pd.DataFrame | None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
@@ -171,8 +172,8 @@ class AmazonDatasetProcessor(BaseDatasetProcessor):
             )
             item2title.columns = ["ItemID", "Title"]
             item2title["ItemID"] = item2title["ItemID"].astype(str)
-            item2title = item2title[
-                item2title["Title"].notna() & item2title["Title"] != "nan"
+            item2title = item2title.loc[
+                item2title["Title"].notna() & item2title["Title"].ne("nan")
             ]
         else:
             item2title = None
@@ -4,8 +4,9 @@ Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
 import os
-from typing import Any
+from typing import Any, Final
 
+import numpy as np
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
@@ -15,54 +16,6 @@ __all__ = [
 ]
 
 
-def read_csv(
-    file_path: str,
-    delimiter: str,
-    columns: list[str] | None = None,
-    types: list[Any] | None = None,
-    header: int | None = None,
-) -> pd.DataFrame:
-    r"""Read a CSV file and return a DataFrame. If ``columns`` is not ``None``,
-    the columns will be renamed to the specified names ``columns``. Each
-    column will be converted to the specified type in ``types``. If ``types``
-    is ``None``, the columns will be automatically inferred by Pandas. In
-    addition, the columns with blank values will be dropped.
-
-    Args:
-        file_path (str):
-            The path of the CSV file.
-        delimiter (str):
-            The delimiter of the CSV file.
-        columns (list[str] | None, optional, default=None):
-            The column names to rename the columns to. If ``None``, no renaming
-            will be performed. The default value is ``None``.
-        types (list[Any], optional, default=None):
-            The types to convert the columns to. If ``None``, the columns
-            will be automatically inferred by Pandas. The default value is
-            ``None``.
-        header (int | None, optional, default=None):
-            The row number to use as the column names. If ``None``, no row
-            will be used as the column names. The default value is ``None``.
-
-    Returns:
-        The DataFrame containing the data from the CSV file.
-    """
-    if types is not None:
-        types = {col: typ for col, typ in zip(columns, types)}
-    df = pd.read_csv(
-        file_path,
-        sep=delimiter,
-        header=header,
-        names=columns,
-        dtype=types,
-        encoding="utf-8",
-        encoding_errors="replace",
-        engine="python",
-    )
-    df = df.dropna()
-    return df
-
-
 class DoubanDatasetProcessor(BaseDatasetProcessor):
     r"""Processor for the Douban datasets.
 
@@ -78,6 +31,14 @@ class DoubanDatasetProcessor(BaseDatasetProcessor):
         metadata (e.g., item title) is not included.
     """
 
+    # positions of (UserID, ItemID, Timestamp), the rating is skipped
+    _USECOLS: Final[list[int]] = [0, 1, 3]
+    _DTYPE_MAP: Final[dict[str, Any]] = {
+        "UserID": np.int32,
+        "ItemID": np.int32,
+        "Timestamp": np.int32,
+    }
+
     def __init__(
         self,
         dataset_dir: str,
@@ -103,13 +64,23 @@ class DoubanDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, False, k_core, sample_user_size)
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        return [os.path.join(raw_dir, f"{self.dataset_name}.tsv")]
+
     def _load_data(self) -> tuple[pd.DataFrame, None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
         - ``interactions`` (pd.DataFrame):
             The user-item interaction data, which is a Pandas DataFrame object.
             Each row represents an interaction ``(UserID, ItemID, Timestamp)``,
-            with types ``(int | str, int | str, int | str)``.
+            with types ``(int32, int32, int32)``.
         - ``item2title`` (None):
             The item titles, which is ``None`` for the Douban dataset.
 
@@ -119,13 +90,34 @@ class DoubanDatasetProcessor(BaseDatasetProcessor):
                 second element is the item titles (``None``).
         """
         raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions = read_csv(
-            os.path.join(raw_dir, f"{self.dataset_name}.tsv"),
-            delimiter="\t",
-            columns=["UserID", "ItemID", "Rating", "Timestamp"],
-            types=[int, int, float, float],
-            header=0,
-        )
-        interactions["Timestamp"] = interactions["Timestamp"].astype("int64")
-        interactions = interactions[["UserID", "ItemID", "Timestamp"]]
+        file_path = os.path.join(raw_dir, f"{self.dataset_name}.tsv")
+        read_kwargs = {
+            "sep": "\t",
+            "header": 0,
+            "usecols": self._USECOLS,
+            "names": list(self._DTYPE_MAP),
+            "encoding": "utf-8",
+            "encoding_errors": "replace",
+            "engine": "c",
+            "memory_map": True,
+        }
+        try:
+            # integral float timestamps (e.g., ``1234567890.0``) are parsed
+            # into integers directly by the C parser, and the NA detection is
+            # skipped, since the blank fields are rejected anyway
+            interactions = pd.read_csv(
+                file_path, dtype=self._DTYPE_MAP, na_filter=False, **read_kwargs
+            )
+        except ValueError:
+            # the rows with blank timestamps are dropped, and the fractional
+            # timestamps are truncated to seconds, while the other failures
+            # (e.g., a blank or non-numeric ID) are raised by the parser again
+            interactions = pd.read_csv(
+                file_path,
+                dtype={**self._DTYPE_MAP, "Timestamp": float},
+                na_filter=True,
+                **read_kwargs,
+            )
+            interactions = interactions.dropna(subset=["Timestamp"])
+            interactions["Timestamp"] = interactions["Timestamp"].astype("int32")
         return interactions, None
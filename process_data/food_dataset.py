@@ -4,8 +4,10 @@ Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
 import os
-from typing import Any
+import re
+from typing import Any, Final
 
+import numpy as np
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
@@ -14,60 +16,7 @@ __all__ = [
     "FoodDatasetProcessor",
 ]
 
-
-def read_csv(
-    file_path: str,
-    delimiter: str,
-    sel_cols: list[int] | list[str] | None = None,
-    columns: list[str] | None = None,
-    types: list[Any] | None = None,
-    header: int | None = None,
-) -> pd.DataFrame:
-    r"""Read a CSV file and return a DataFrame. Only the columns specified in
-    ``select_cols`` will be read. The columns are renamed to the specified
-    names ``columns``, which should be a list of strings. Each column will be
-    converted to the specified type in ``types``. If ``types`` is ``None``,
-    the columns will be automatically inferred by Pandas. In addition, the
-    columns with blank values will be dropped.
-
-    Args:
-        file_path (str):
-            The path of the CSV file.
-        delimiter (str):
-            The delimiter of the CSV file.
-        select_cols (list[int] | list[str] | None, optional, default=None):
-            The columns to select from the CSV file. If ``None``, all columns
-            will be selected. The default value is ``None``.
-        columns (list[str] | None, optional, default=None):
-            The column names to rename the columns to. If ``None``, no renaming
-            will be performed. The default value is ``None``.
-        types (list[Any], optional, default=None):
-            The types to convert the columns to. If ``None``, the columns
-            will be automatically inferred by Pandas. The default value is
-            ``None``.
-        header (int | None, optional, default=None):
-            The row number to use as the column names. If ``None``, no row
-            will be used as the column names. The default value is ``None``.
-
-    Returns:
-        The DataFrame containing the data from the CSV file.
-    """
-    df = pd.read_csv(
-        file_path,
-        sep=delimiter,
-        header=header,
-        usecols=sel_cols,
-        encoding="utf-8",
-        encoding_errors="replace",
-        engine="python",
-    )
-    if columns is not None:
-        df.columns = columns
-    if types is not None:
-        types = {col: typ for col, typ in zip(columns, types)}
-        df = df.astype(types)
-    df = df.dropna()
-    return df
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
 class FoodDatasetProcessor(BaseDatasetProcessor):
@@ -90,6 +39,16 @@ class FoodDatasetProcessor(BaseDatasetProcessor):
         - The other columns are not used.
     """
 
+    _DTYPE_MAP: Final[dict[str, Any]] = {
+        "UserID": np.int32,
+        "ItemID": np.int32,
+        "Timestamp": str,
+    }
+    _TITLE_DTYPE_MAP: Final[dict[str, Any]] = {
+        "Title": str,
+        "ItemID": np.int32,
+    }
+
     def __init__(
         self,
         dataset_dir: str,
@@ -123,13 +82,26 @@ class FoodDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, meta_available, k_core, sample_user_size)
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        raw_files = [os.path.join(raw_dir, "RAW_interactions.csv")]
+        if self.meta_available:
+            raw_files.append(os.path.join(raw_dir, "RAW_recipes.csv"))
+        return raw_files
+
     def _load_data(self) -> tuple[pd.DataFrame, pd.DataFrame | None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
         - ``interactions`` (pd.DataFrame):
             The user-item interaction data, which is a Pandas DataFrame object.
             Each row represents an interaction ``(UserID, ItemID, Timestamp)``,
-            with types ``(int | str, int | str, int | str)``.
+            with types ``(int32, int32, int32)``.
         - ``item2title`` (pd.DataFrame | None):
             The item titles. If ``meta_available`` is ``False``, ``item2title``
             will be ``None``. If ``meta_available`` is ``True``, it will be a
@@ -143,33 +115,47 @@ class FoodDatasetProcessor(BaseDatasetProcessor):
                 ``False``, the second element will be ``None``.
         """
         raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions = read_csv(
+        interactions = pd.read_csv(
             os.path.join(raw_dir, "RAW_interactions.csv"),
-            delimiter=",",
-            sel_cols=[0, 1, 2],
-            columns=["UserID", "ItemID", "Timestamp"],
-            types=[int, int, str],
+            sep=",",
             header=0,
+            usecols=[0, 1, 2],
+            names=list(self._DTYPE_MAP),
+            dtype=self._DTYPE_MAP,
+            encoding="utf-8",
+            encoding_errors="replace",
+            engine="c",
+            memory_map=True,
+        ).dropna()
+        # the dates are fixed-width ``%Y-%m-%d`` strings, which numpy parses
+        # into days directly without creating Python objects
+        interactions["Timestamp"] = (
+            np.asarray(interactions["Timestamp"], dtype="S10")
+            .astype("datetime64[D]")
+            .astype("datetime64[s]")
+            .view("int64")
+            .astype("int32")
         )
-        interactions["Timestamp"] = pd.to_datetime(
-            interactions["Timestamp"], format="%Y-%m-%d"
-        )
-        interactions["Timestamp"] = interactions["Timestamp"].astype("int64") // 10**9
         if self.meta_available:
-            item2title = read_csv(
+            item2title = pd.read_csv(
                 os.path.join(raw_dir, "RAW_recipes.csv"),
-                delimiter=",",
-                sel_cols=[0, 1],
-                columns=["Title", "ItemID"],
-                types=[str, int],
+                sep=",",
                 header=0,
-            )
+                usecols=[0, 1],
+                names=list(self._TITLE_DTYPE_MAP),
+                dtype=self._TITLE_DTYPE_MAP,
+                encoding="utf-8",
+                encoding_errors="replace",
+                engine="c",
+                memory_map=True,
+            ).dropna()
             item2title = item2title[["ItemID", "Title"]]
-            item2title = item2title[
-                item2title["Title"].notna() & item2title["Title"] != "nan"
+            item2title = item2title.loc[
+                item2title["Title"].notna()
+                & ~item2title["Title"].isin(["nan", "NaN", "None", ""])
             ]
-            item2title["Title"] = (
-                item2title["Title"].str.strip().str.replace(r"\s+", " ", regex=True)
+            item2title["Title"] = item2title["Title"].map(
+                lambda title: _WHITESPACE_RE.sub(" ", title.strip())
             )
         else:
             item2title = None
@@ -3,64 +3,177 @@ r"""Gowalla dataset processor.
 Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
+import contextlib
+import gzip
 import os
-from typing import Any
+import shutil
+import subprocess
+from typing import IO, Any, Final, Iterator
 
+import numpy as np
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
+from process_data.io import open_sequential
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import numba as nb
+except ImportError:
+    nb = None
+
+try:
+    from isal import igzip
+except ImportError:
+    igzip = None
 
 __all__ = [
     "GowallaDatasetProcessor",
 ]
 
 
-def read_csv(
-    file_path: str,
-    delimiter: str,
-    columns: list[str] | None = None,
-    types: list[Any] | None = None,
-    header: int | None = None,
-) -> pd.DataFrame:
-    r"""Read a CSV file and return a DataFrame. If ``columns`` is not ``None``,
-    the columns will be renamed to the specified names ``columns``. Each
-    column will be converted to the specified type in ``types``. If ``types``
-    is ``None``, the columns will be automatically inferred by Pandas. In
-    addition, the columns with blank values will be dropped.
+if nb is not None:
+
+    @nb.njit(cache=True, inline="always")
+    def _two_digits(row: np.ndarray, pos: int) -> int:
+        r"""Parse the two ASCII digits at ``row[pos:pos + 2]``."""
+        return (np.int64(row[pos]) - 48) * 10 + (np.int64(row[pos + 1]) - 48)
+
+    @nb.njit(cache=True, inline="always")
+    def _days_in_month(y: int, m: int) -> int:
+        r"""Return the number of days in the month ``m`` of the year ``y``."""
+        if m == 2:
+            return 29 if y % 4 == 0 and (y % 100 != 0 or y % 400 == 0) else 28
+        return 30 if m == 4 or m == 6 or m == 9 or m == 11 else 31
+
+    @nb.njit(parallel=True, cache=True)
+    def _iso_to_epoch_kernel(buf: np.ndarray) -> tuple[np.ndarray, int]:
+        r"""Convert the fixed-width ``%Y-%m-%dT%H:%M:%SZ`` timestamps to the
+        unix time in seconds. Each row of ``buf`` contains the 20 ASCII bytes
+        of one timestamp. A row is malformed if it has any unexpected byte or
+        any field out of range (e.g., month 13 or February 30). The date is
+        converted to days since epoch by the ``days_from_civil`` algorithm of
+        Howard Hinnant.
+
+        Returns:
+            tuple[np.ndarray, int]:
+                The unix timestamps, and the number of malformed rows.
+        """
+        n = buf.shape[0]
+        out = np.zeros(n, dtype=np.int64)
+        invalid = 0
+        for i in nb.prange(n):
+            row = buf[i]
+            bad = (
+                row[4] != 45  # "-"
+                or row[7] != 45  # "-"
+                or row[10] != 84  # "T"
+                or row[13] != 58  # ":"
+                or row[16] != 58  # ":"
+                or row[19] != 90  # "Z"
+            )
+            for j in range(19):
+                if j != 4 and j != 7 and j != 10 and j != 13 and j != 16:
+                    bad = bad or row[j] < 48 or row[j] > 57
+            y = _two_digits(row, 0) * 100 + _two_digits(row, 2)
+            m = _two_digits(row, 5)
+            d = _two_digits(row, 8)
+            hour = _two_digits(row, 11)
+            minute = _two_digits(row, 14)
+            second = _two_digits(row, 17)
+            # the calendar ranges, where a leap second (60) is allowed
+            bad = (
+                bad
+                or m < 1
+                or m > 12
+                or d < 1
+                or d > _days_in_month(y, m)
+                or hour > 23
+                or minute > 59
+                or second > 60
+            )
+            if bad:
+                invalid += 1
+                continue
+            y -= m <= 2
+            era = y // 400
+            yoe = y - era * 400
+            doy = (153 * (m - 3 if m > 2 else m + 9) + 2) // 5 + d - 1
+            doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+            days = era * 146097 + doe - 719468
+            out[i] = days * 86400 + hour * 3600 + minute * 60 + second
+        return out, invalid
+
+
+def iso_to_epoch(timestamps: pd.Series) -> np.ndarray:
+    r"""Convert the ISO 8601 timestamps (e.g., ``2010-10-19T23:55:27Z``) to
+    the unix time in seconds. If ``numba`` is installed, the timestamps are
+    parsed by a parallel JIT-compiled kernel over their raw bytes, otherwise
+    by ``pd.to_datetime``.
+
+    .. warning::
+        If any timestamp does not match the ``%Y-%m-%dT%H:%M:%SZ`` format, an
+        ``ValueError`` will be raised.
+
+    Args:
+        timestamps (pd.Series):
+            The ISO 8601 timestamps.
+
+    Returns:
+        The unix timestamps in seconds.
+    """
+    if nb is None:
+        timestamps = pd.to_datetime(
+            timestamps, format="%Y-%m-%dT%H:%M:%SZ", cache=True
+        )
+        if timestamps.isna().any():
+            # the blank timestamps are parsed as ``NaT`` rather than rejected
+            raise ValueError(
+                f"Found {timestamps.isna().sum()} timestamps not in the "
+                "%Y-%m-%dT%H:%M:%SZ format."
+            )
+        return timestamps.to_numpy().astype("datetime64[s]").view("int64")
+    buf = np.asarray(timestamps, dtype="S20").view(np.uint8).reshape(-1, 20)
+    epochs, invalid = _iso_to_epoch_kernel(buf)
+    if invalid:
+        raise ValueError(
+            f"Found {invalid} timestamps not in the %Y-%m-%dT%H:%M:%SZ format."
+        )
+    return epochs
+
+
+@contextlib.contextmanager
+def open_gzip(file_path: str) -> Iterator[IO[bytes]]:
+    r"""Open a gzip file for reading the decompressed bytes. The fastest
+    available decompressor is used: the SIMD-accelerated ``isal.igzip`` if
+    the optional ``isal`` package is installed, then the ``pigz`` command if
+    it is on ``PATH``, and finally the standard ``gzip`` module.
 
     Args:
         file_path (str):
-            The path of the CSV file.
-        delimiter (str):
-            The delimiter of the CSV file.
-        columns (list[str] | None, optional, default=None):
-            The column names to rename the columns to. If ``None``, no renaming
-            will be performed. The default value is ``None``.
-        types (list[Any], optional, default=None):
-            The types to convert the columns to. If ``None``, the columns
-            will be automatically inferred by Pandas. The default value is
-            ``None``.
-        header (int | None, optional, default=None):
-            The row number to use as the column names. If ``None``, no row
-            will be used as the column names. The default value is ``None``.
+            The path of the gzip file.
 
     Returns:
-        The DataFrame containing the data from the CSV file.
+        The context manager yielding the binary stream of decompressed bytes.
     """
-    if types is not None:
-        types = {col: typ for col, typ in zip(columns, types)}
-    df = pd.read_csv(
-        file_path,
-        sep=delimiter,
-        header=header,
-        names=columns,
-        dtype=types,
-        encoding="utf-8",
-        encoding_errors="replace",
-        engine="python",
-    )
-    df = df.dropna()
-    return df
+    if igzip is not None:
+        with open_sequential(file_path) as raw, igzip.open(raw, "rb") as file:
+            yield file
+    elif shutil.which("pigz") is not None:
+        # pigz reads the file from the advised file descriptor
+        with open_sequential(file_path) as raw, subprocess.Popen(
+            ["pigz", "-dc"], stdin=raw, stdout=subprocess.PIPE
+        ) as process:
+            yield process.stdout
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+    else:
+        with open_sequential(file_path) as raw, gzip.open(raw, "rb") as file:
+            yield file
 
 
 class GowallaDatasetProcessor(BaseDatasetProcessor):
@@ -81,6 +194,14 @@ class GowallaDatasetProcessor(BaseDatasetProcessor):
         title metadata is not available.
     """
 
+    # positions of (UserID, Timestamp, ItemID), the coordinates are skipped
+    _USECOLS: Final[list[int]] = [0, 1, 4]
+    _DTYPE_MAP: Final[dict[str, Any]] = {
+        "UserID": np.int32,
+        "Timestamp": str,
+        "ItemID": np.int32,
+    }
+
     def __init__(
         self,
         dataset_dir: str,
@@ -106,13 +227,23 @@ class GowallaDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, False, k_core, sample_user_size)
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        return [os.path.join(raw_dir, "loc-gowalla_totalCheckins.txt.gz")]
+
     def _load_data(self) -> tuple[pd.DataFrame, None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
         - ``interactions`` (pd.DataFrame):
             The user-item interaction data, which is a Pandas DataFrame object.
             Each row represents an interaction ``(UserID, ItemID, Timestamp)``,
-            with types ``(int | str, int | str, int | str)``.
+            with types ``(int32, int32, int32)``.
         - ``item2title`` (None):
             The item titles, which is ``None`` for the Gowalla dataset.
 
@@ -121,17 +252,101 @@ class GowallaDatasetProcessor(BaseDatasetProcessor):
                 The first element is the user-item interaction data, and the
                 second element is the item titles (``None``).
         """
+        if pl is not None:
+            return self._load_data_polars()
         raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions = read_csv(
-            os.path.join(raw_dir, "loc-gowalla_totalCheckins.txt.gz"),
-            delimiter="\t",
-            columns=["UserID", "Timestamp", "Latitude", "Longitude", "ItemID"],
-            types=[int, str, float, float, int],
-            header=None,
-        )
-        interactions = interactions[["UserID", "ItemID", "Timestamp"]]
-        interactions["Timestamp"] = pd.to_datetime(
-            interactions["Timestamp"], format="%Y-%m-%dT%H:%M:%SZ"
-        )
-        interactions["Timestamp"] = interactions["Timestamp"].astype("int64") // 10**9
+        file_path = os.path.join(raw_dir, "loc-gowalla_totalCheckins.txt.gz")
+
+        def parse(na_filter: bool) -> pd.DataFrame:
+            # the integer columns cannot hold the blank values, so the IDs are
+            # parsed as floats with the NA detection
+            dtype = (
+                {**self._DTYPE_MAP, "UserID": float, "ItemID": float}
+                if na_filter
+                else self._DTYPE_MAP
+            )
+            with open_gzip(file_path) as file:
+                checkins = pd.read_csv(
+                    file,
+                    sep="\t",
+                    header=None,
+                    usecols=self._USECOLS,
+                    names=list(self._DTYPE_MAP),
+                    dtype=dtype,
+                    encoding="utf-8",
+                    encoding_errors="replace",
+                    engine="c",
+                    na_filter=na_filter,
+                )
+            if na_filter:
+                checkins = checkins.dropna()
+            # build the result in one go instead of selecting and overwriting
+            # columns
+            return pd.DataFrame(
+                {
+                    "UserID": checkins["UserID"].to_numpy(np.int32),
+                    "ItemID": checkins["ItemID"].to_numpy(np.int32),
+                    "Timestamp": iso_to_epoch(checkins["Timestamp"]).astype(np.int32),
+                },
+                copy=False,
+            )
+
+        try:
+            # the blank fields are rejected by the parsers of the IDs and
+            # timestamps, so the NA detection and dropping are skipped unless
+            # there are any
+            interactions = parse(na_filter=False)
+        except ValueError:
+            interactions = parse(na_filter=True)
+        return interactions, None
+
+    def _load_data_polars(self) -> tuple[pd.DataFrame, None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but with
+        a ``polars`` lazy query. The CSV scan, column selection, blank value
+        filtering and timestamp conversion are fused into a single
+        multi-threaded execution, and the result is converted to a Pandas
+        DataFrame only once at the end.
+
+        .. note::
+            This method requires the optional ``polars`` package, and is used
+            by :meth:`_load_data` automatically if ``polars`` is installed.
+
+        Returns:
+            tuple[pd.DataFrame, None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles (``None``).
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        with open_gzip(
+            os.path.join(raw_dir, "loc-gowalla_totalCheckins.txt.gz")
+        ) as file:
+            interactions = (
+                pl.scan_csv(
+                    file,
+                    separator="\t",
+                    has_header=False,
+                    new_columns=[
+                        "UserID",
+                        "Timestamp",
+                        "Latitude",
+                        "Longitude",
+                        "ItemID",
+                    ],
+                    schema_overrides={
+                        "UserID": pl.Int32,
+                        "Timestamp": pl.String,
+                        "ItemID": pl.Int32,
+                    },
+                )
+                .select("UserID", "ItemID", "Timestamp")
+                .drop_nulls()
+                .with_columns(
+                    pl.col("Timestamp")
+                    .str.strptime(pl.Datetime("us"), "%Y-%m-%dT%H:%M:%SZ")
+                    .dt.epoch("s")
+                    .cast(pl.Int32)
+                )
+                .collect()
+                .to_pandas()
+            )
         return interactions, None
@@ -0,0 +1,490 @@
+r"""Shared readers of the raw data files for SeqRecBenchmark.
+
+Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
+"""
+
+import ast
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Final
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.json as pa_json
+except ImportError:
+    pa, pc, pa_csv, pa_json = None, None, None, None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__all__ = [
+    "open_sequential",
+    "read_csv",
+    "read_csv_arrow",
+    "read_json",
+    "parse_literal",
+    "read_literal_range",
+    "read_literal_json",
+]
+
+# the (approximate) number of bytes parsed by each worker process
+CHUNK_SIZE: Final[int] = 64 << 20
+
+
+def open_sequential(
+    file_path: str, mode: str = "rb", encoding: str | None = None
+) -> IO:
+    r"""Open a file that is read once from the beginning to the end. On the
+    platforms supporting ``os.posix_fadvise``, the kernel is advised that the
+    file is accessed sequentially, which enlarges the readahead window for
+    cold (uncached) reads of large files.
+
+    Args:
+        file_path (str):
+            The path of the file.
+        mode (str, optional, default="rb"):
+            The mode to open the file with. The default value is ``"rb"``.
+        encoding (str | None, optional, default=None):
+            The encoding of the file in the text mode. The default value is
+            ``None``.
+
+    Returns:
+        The file object, which can be used as a context manager.
+    """
+    file = open(file_path, mode, encoding=encoding)
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            # the advice is only a hint, e.g., some file systems do not support it
+            pass
+    return file
+
+
+def read_csv(
+    file_path: str | IO[bytes],
+    delimiter: str,
+    columns: list[str] | None = None,
+    types: list[Any] | None = None,
+    header: int | None = None,
+    sel_cols: list[int] | list[str] | None = None,
+    quoting: int = csv.QUOTE_MINIMAL,
+    na_filter: bool | None = None,
+) -> pd.DataFrame:
+    r"""Read a CSV file and return a DataFrame. If ``columns`` is not ``None``,
+    the columns will be renamed to the specified names ``columns``. Each
+    column will be converted to the specified type in ``types``. If ``types``
+    is ``None``, the columns will be automatically inferred by Pandas. If
+    ``sel_cols`` is not ``None``, only the selected (renamed) columns will be
+    parsed. In addition, the columns with blank values will be dropped.
+
+    .. note::
+        The file is memory-mapped and parsed by the fast C engine of
+        ``pd.read_csv``, except for the multi-character delimiters (e.g.,
+        ``::``), which are only supported by the Python engine.
+
+    Args:
+        file_path (str | IO[bytes]):
+            The path of the CSV file, or a binary file object of its content.
+        delimiter (str):
+            The delimiter of the CSV file.
+        columns (list[str] | None, optional, default=None):
+            The column names to rename the columns to. If ``None``, no renaming
+            will be performed. The default value is ``None``.
+        types (list[Any], optional, default=None):
+            The types to convert the columns to. If ``None``, the columns
+            will be automatically inferred by Pandas. The default value is
+            ``None``.
+        header (int | None, optional, default=None):
+            The row number to use as the column names. If ``None``, no row
+            will be used as the column names. The default value is ``None``.
+        sel_cols (list[int] | list[str] | None, optional, default=None):
+            The (renamed) columns to parse. If ``None``, all the columns will
+            be parsed. The columns can also be selected by their positions,
+            where ``columns`` and ``types`` are given for the selected columns
+            only, e.g., if the number of columns varies between the files. The
+            default value is ``None``.
+        quoting (int, optional, default=csv.QUOTE_MINIMAL):
+            The quoting behavior of the CSV file, e.g., ``csv.QUOTE_NONE`` if
+            the quote characters in the fields are not special. The default
+            value is ``csv.QUOTE_MINIMAL``.
+        na_filter (bool | None, optional, default=None):
+            Whether to detect and drop the blank values. If ``False``, the
+            blank strings of the string columns are kept as they are, e.g., if
+            they are rejected by the further parsing anyway. If ``None``, the
+            blank values are only detected if any non-integer column is parsed.
+            In any case, if a blank value is rejected by the parser of a typed
+            column, the file is parsed again with the NA detection. The default
+            value is ``None``.
+
+    Returns:
+        The DataFrame containing the data from the CSV file.
+    """
+    if types is not None:
+        types = {col: typ for col, typ in zip(columns, types)}
+    parsed_cols = sel_cols if sel_cols and isinstance(sel_cols[0], str) else columns
+    if na_filter is None:
+        # the integer columns cannot hold blank values, so the per-field NA
+        # detection is only needed if any other column is parsed
+        na_filter = types is None or not all(
+            pd.api.types.is_integer_dtype(types[col]) for col in parsed_cols
+        )
+    # the C parser only supports single-character delimiters
+    engine = "c" if len(delimiter) == 1 else "python"
+
+    def parse(na_filter: bool, dtype: dict[str, Any] | None) -> pd.DataFrame:
+        return pd.read_csv(
+            file_path,
+            sep=delimiter,
+            header=header,
+            names=columns,
+            usecols=sel_cols,
+            dtype=dtype,
+            quoting=quoting,
+            encoding="utf-8",
+            encoding_errors="replace",
+            engine=engine,
+            na_filter=na_filter,
+            # only the files on disk can be memory-mapped
+            memory_map=engine == "c" and isinstance(file_path, str),
+        )
+
+    try:
+        df = parse(na_filter, types)
+    except ValueError as error:
+        # the blank fields are rejected by the parsers of the integer columns
+        # (and of all the typed columns without the NA detection), which is
+        # rare, so only then the file is parsed again with the NA detection,
+        # unless the error is not caused by the values or the file object
+        # cannot be rewound
+        if (
+            types is None
+            or isinstance(error, pd.errors.ParserError)
+            or not (isinstance(file_path, str) or file_path.seekable())
+        ):
+            raise
+        if not isinstance(file_path, str):
+            file_path.seek(0)
+        int_types = {
+            col: typ
+            for col, typ in types.items()
+            if pd.api.types.is_integer_dtype(typ)
+        }
+        # the integer columns are parsed as floats, which hold the blank values
+        # and are exact for the integers below 2^53
+        df = parse(True, {**types, **dict.fromkeys(int_types, np.float64)}).dropna()
+        int_types = {col: typ for col, typ in int_types.items() if col in df.columns}
+        floats = df[list(int_types)]
+        df = df.astype(int_types)
+        if not df[list(int_types)].eq(floats).all(axis=None):
+            raise ValueError(f"Found non-integer values in {list(int_types)}.")
+        return df
+    if na_filter:
+        df = df.dropna(
+            subset=[
+                col for col in df.columns if not pd.api.types.is_integer_dtype(df[col])
+            ]
+        )
+    return df
+
+
+def read_csv_arrow(
+    file_path: str,
+    delimiter: str,
+    sel_cols: list[str],
+    columns: list[str],
+    types: list[Any],
+) -> "pa.Table":
+    r"""Read a CSV file with the multi-threaded PyArrow CSV reader and return
+    an Arrow table. The first row of the file is used as the column names, and
+    only the columns specified in ``sel_cols`` will be parsed. The columns are
+    renamed to ``columns`` and converted to the specified type in ``types``
+    while parsing. In addition, the rows with blank values will be dropped.
+
+    .. note::
+        This function requires the optional ``pyarrow`` package. The file is
+        memory-mapped and decoded in blocks of 32 MiB in parallel, which is
+        much faster than ``pd.read_csv`` for large files.
+
+    Args:
+        file_path (str):
+            The path of the CSV file.
+        delimiter (str):
+            The delimiter of the CSV file.
+        sel_cols (list[str]):
+            The names of the columns to select from the CSV file.
+        columns (list[str]):
+            The column names to rename the selected columns to.
+        types (list[Any]):
+            The types to convert the selected columns to, e.g., ``int`` or
+            ``float``.
+
+    Returns:
+        The Arrow table containing the data from the CSV file.
+    """
+    with pa.memory_map(file_path, "r") as source:
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(use_threads=True, block_size=32 << 20),
+            parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=sel_cols,
+                column_types={
+                    col: pa.from_numpy_dtype(np.dtype(typ))
+                    for col, typ in zip(sel_cols, types)
+                },
+            ),
+        )
+    return table.rename_columns(columns).drop_null()
+
+
+def read_json(
+    file_path: str,
+    selected_cols: list[str] | None = None,
+    categorical_cols: list[str] | None = None,
+) -> pd.DataFrame:
+    r"""Read a JSON file and return a DataFrame. Note that only the columns
+    specified in ``selected_cols`` will be selected. If ``selected_cols`` is
+    ``None``, all columns will be selected. The rows with blank values in the
+    selected columns will be dropped. The columns in ``categorical_cols`` will
+    be converted to the ``category`` dtype.
+
+    .. note::
+        If ``selected_cols`` is not ``None``, the file is parsed by the
+        multi-threaded PyArrow JSON reader if the optional ``pyarrow`` package
+        is installed, where only the selected fields are parsed (as strings),
+        or otherwise streamed line by line with the optional ``orjson``
+        package, where only the selected fields are kept. If neither is
+        installed, the whole file is parsed by ``pd.read_json``.
+
+    Args:
+        file_path (str):
+            The path of the JSON file.
+        selected_cols (list[str], optional, default=None):
+            The columns to select from the JSON file. If ``None``, all
+            columns will be selected. The default value is ``None``.
+            Note that if the selected columns remain blank in a row, this
+            row will be dropped.
+        categorical_cols (list[str], optional, default=None):
+            The columns to be converted to the ``category`` dtype, e.g., the
+            string IDs. If ``None``, no column will be converted. The default
+            value is ``None``.
+
+    Returns:
+        The DataFrame containing the data from the JSON file.
+    """
+    if pa is not None and selected_cols is not None:
+        # only the selected fields are parsed, as strings
+        schema = pa.schema([(col, pa.string()) for col in selected_cols])
+        table = pa_json.read_json(
+            file_path,
+            read_options=pa_json.ReadOptions(use_threads=True, block_size=64 << 20),
+            parse_options=pa_json.ParseOptions(
+                explicit_schema=schema, unexpected_field_behavior="ignore"
+            ),
+        )
+        # the blank values are dropped in Arrow before the conversion
+        table = table.select(selected_cols).drop_null()
+        for col in categorical_cols or []:
+            # the repeated values are converted to Python strings only once
+            table = table.set_column(
+                table.schema.get_field_index(col), col, pc.dictionary_encode(table[col])
+            )
+        return table.to_pandas()
+    if orjson is not None and selected_cols is not None:
+        # collect the selected fields column by column, instead of building
+        # a dictionary for every row
+        data = {col: [] for col in selected_cols}
+        with open_sequential(file_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = orjson.loads(line)
+                for col, values in data.items():
+                    values.append(obj.get(col))
+        df = pd.DataFrame(data)
+    else:
+        df = pd.read_json(file_path, lines=True)
+        if selected_cols is not None:
+            df = df[selected_cols]
+    df = df.dropna()
+    for col in categorical_cols or []:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def parse_literal(line: bytes) -> dict[str, Any]:
+    r"""Parse one line of a file with one Python dictionary literal per line,
+    e.g., ``{'id': '761140', 'early_access': False}`` in the Steam files. If
+    the line has no double quotes and no backslashes, all the strings are
+    single-quoted without escapes, so the line is rewritten to JSON at the
+    byte level and parsed by ``orjson`` (or the standard ``json`` module).
+    Otherwise, or if the rewritten line is not valid JSON, the line is parsed
+    by ``ast.literal_eval``.
+
+    Args:
+        line (bytes):
+            The line to parse, without the trailing newline.
+
+    Returns:
+        The parsed dictionary.
+    """
+    if b'"' not in line and b"\\" not in line:
+        # the even parts are outside the strings, where only the keywords
+        # ``True``, ``False`` and ``None`` differ from JSON
+        parts = line.split(b"'")
+        parts[::2] = [
+            part.replace(b"True", b"true")
+            .replace(b"False", b"false")
+            .replace(b"None", b"null")
+            for part in parts[::2]
+        ]
+        try:
+            if orjson is not None:
+                return orjson.loads(b'"'.join(parts))
+            return json.loads(b'"'.join(parts))
+        except ValueError:
+            pass
+    return ast.literal_eval(line.decode("utf-8"))
+
+
+def read_literal_range(
+    file_path: str, selected_cols: list[str], start: int, end: int
+) -> tuple[dict[str, list[Any]], set[str]]:
+    r"""Parse the lines starting in the byte range ``[start, end)`` of a file
+    with one Python dictionary literal per line (see :func:`parse_literal`),
+    and collect the selected fields column by column. A line that is cut by
+    ``start`` belongs to the previous range, so the ranges partitioning a file
+    can be parsed independently, e.g., in different processes.
+
+    Args:
+        file_path (str):
+            The path of the file.
+        selected_cols (list[str]):
+            The fields to collect. A missing field in a line is ``None``.
+        start (int):
+            The start byte offset of the range.
+        end (int):
+            The end byte offset (exclusive) of the range.
+
+    Returns:
+        tuple[dict[str, list[Any]], set[str]]:
+            The first element maps each selected field to its values, and the
+            second element is the set of selected fields not found in any line
+            of the range.
+    """
+    data = {col: [] for col in selected_cols}
+    missing_cols = set(selected_cols)
+    with open_sequential(file_path) as f:
+        if start > 0:
+            # skip the rest of the line containing the byte before the range
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = parse_literal(line)
+            except Exception as error:
+                print(f"Error parsing line: {line.decode('utf-8', 'replace')}")
+                print(f"Error message: {error}")
+                continue
+            for col, values in data.items():
+                values.append(row.get(col))
+            if missing_cols:
+                missing_cols.difference_update(row)
+    return data, missing_cols
+
+
+def read_literal_json(
+    file_path: str, selected_cols: list[str] | None = None
+) -> pd.DataFrame:
+    r"""Read a file with one Python dictionary literal per line (e.g., the
+    Steam files) and return a DataFrame. Note that only the columns specified
+    in ``selected_cols`` will be selected. If ``selected_cols`` is ``None``,
+    all columns will be selected. The rows with blank values in the selected
+    columns will be dropped.
+
+    .. warning::
+        If the ``selected_cols`` contains a column that is not in the file,
+        an ``KeyError`` will be raised.
+
+    .. note::
+        Each line is parsed by :func:`parse_literal`. If ``selected_cols`` is
+        given, the lines are parsed by :func:`read_literal_range`, in parallel
+        worker processes for files larger than ``CHUNK_SIZE``.
+
+    Args:
+        file_path (str):
+            The path of the file.
+        selected_cols (list[str], optional, default=None):
+            The columns to select from the file. If ``None``, all columns will
+            be selected. The default value is ``None``. Note that if the
+            selected columns remain blank in a row, this row will be dropped.
+
+    Returns:
+        The DataFrame containing the data from the file.
+    """
+    if selected_cols is None:
+        with open_sequential(file_path) as f:
+            lines = f.readlines()
+        data = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data.append(parse_literal(line))
+            except Exception as error:
+                print(f"Error parsing line: {line.decode('utf-8', 'replace')}")
+                print(f"Error message: {error}")
+        df = pd.DataFrame(data)
+    else:
+        # the file is split into the byte ranges of about CHUNK_SIZE bytes,
+        # which are parsed in parallel (if more than one) and concatenated in
+        # the original order of the lines
+        file_size = os.path.getsize(file_path)
+        num_chunks = max(1, min(os.cpu_count() or 1, file_size // CHUNK_SIZE))
+        bounds = [file_size * i // num_chunks for i in range(num_chunks + 1)]
+        if num_chunks == 1:
+            results = [read_literal_range(file_path, selected_cols, 0, file_size)]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=num_chunks, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                results = list(
+                    executor.map(
+                        read_literal_range,
+                        itertools.repeat(file_path),
+                        itertools.repeat(selected_cols),
+                        bounds[:-1],
+                        bounds[1:],
+                    )
+                )
+        data, missing_cols = results[0]
+        for chunk_data, chunk_missing_cols in results[1:]:
+            for col, values in data.items():
+                values.extend(chunk_data[col])
+            missing_cols &= chunk_missing_cols
+        if missing_cols:
+            raise KeyError(f"{sorted(missing_cols)} not in the JSON file")
+        df = pd.DataFrame(data)
+    if selected_cols is not None:
+        df = df[selected_cols]
+    df = df.dropna()
+    return df
@@ -4,72 +4,30 @@ Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
 import os
-from typing import Any
+from typing import Any, Final
 
+import numpy as np
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
+from process_data.io import read_csv_arrow
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa, pc = None, None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 __all__ = [
     "KuaiRecDatasetProcessor",
 ]
 
 
-def read_csv(
-    file_path: str,
-    delimiter: str,
-    sel_cols: list[int] | list[str] | None = None,
-    columns: list[str] | None = None,
-    types: list[Any] | None = None,
-    header: int | None = None,
-) -> pd.DataFrame:
-    r"""Read a CSV file and return a DataFrame. Only the columns specified in
-    ``select_cols`` will be read. The columns are renamed to the specified
-    names ``columns``, which should be a list of strings. Each column will be
-    converted to the specified type in ``types``. If ``types`` is ``None``,
-    the columns will be automatically inferred by Pandas. In addition, the
-    columns with blank values will be dropped.
-
-    Args:
-        file_path (str):
-            The path of the CSV file.
-        delimiter (str):
-            The delimiter of the CSV file.
-        select_cols (list[int] | list[str] | None, optional, default=None):
-            The columns to select from the CSV file. If ``None``, all columns
-            will be selected. The default value is ``None``.
-        columns (list[str] | None, optional, default=None):
-            The column names to rename the columns to. If ``None``, no renaming
-            will be performed. The default value is ``None``.
-        types (list[Any], optional, default=None):
-            The types to convert the columns to. If ``None``, the columns
-            will be automatically inferred by Pandas. The default value is
-            ``None``.
-        header (int | None, optional, default=None):
-            The row number to use as the column names. If ``None``, no row
-            will be used as the column names. The default value is ``None``.
-
-    Returns:
-        The DataFrame containing the data from the CSV file.
-    """
-    df = pd.read_csv(
-        file_path,
-        sep=delimiter,
-        header=header,
-        usecols=sel_cols,
-        encoding="utf-8",
-        encoding_errors="replace",
-        engine="python",
-    )
-    if columns is not None:
-        df.columns = columns
-    if types is not None:
-        types = {col: typ for col, typ in zip(columns, types)}
-        df = df.astype(types)
-    df = df.dropna()
-    return df
-
-
 class KuaiRecDatasetProcessor(BaseDatasetProcessor):
     r"""Processor for the KuaiRec dataset.
 
@@ -91,6 +49,19 @@ class KuaiRecDatasetProcessor(BaseDatasetProcessor):
         process it, as the titles are not appropriate for recommendation tasks.
     """
 
+    _COLUMN_MAP: Final[dict[str, str]] = {
+        "user_id": "UserID",
+        "video_id": "ItemID",
+        "timestamp": "Timestamp",
+        "watch_ratio": "WatchRatio",
+    }
+    _DTYPE_MAP: Final[dict[str, Any]] = {
+        "user_id": np.int32,
+        "video_id": np.int32,
+        "timestamp": float,
+        "watch_ratio": float,
+    }
+
     def __init__(
         self,
         dataset_dir: str,
@@ -116,13 +87,26 @@ class KuaiRecDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, False, k_core, sample_user_size)
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        return [
+            os.path.join(raw_dir, "big_matrix.csv"),
+            os.path.join(raw_dir, "small_matrix.csv"),
+        ]
+
     def _load_data(self) -> tuple[pd.DataFrame, None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
         - ``interactions`` (pd.DataFrame):
             The user-item interaction data, which is a Pandas DataFrame object.
             Each row represents an interaction ``(UserID, ItemID, Timestamp)``,
-            with types ``(int | str, int | str, int | str)``.
+            with types ``(int32, int32, float64)``.
         - ``item2title`` (None):
             The item titles, which is ``None`` for the Douban dataset.
 
@@ -131,27 +115,116 @@ class KuaiRecDatasetProcessor(BaseDatasetProcessor):
                 The first element is the user-item interaction data, and the
                 second element is the item titles (``None``).
         """
+        if pl is not None:
+            return self._load_data_polars()
+        if pa is not None:
+            return self._load_data_arrow()
         raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions_big = read_csv(
-            os.path.join(raw_dir, "big_matrix.csv"),
-            delimiter=",",
-            sel_cols=["user_id", "video_id", "timestamp", "watch_ratio"],
-            columns=["UserID", "ItemID", "Timestamp", "WatchRatio"],
-            types=[int, int, float, float],
-            header=0,
-        )
-        interactions_small = read_csv(
-            os.path.join(raw_dir, "small_matrix.csv"),
-            delimiter=",",
-            sel_cols=["user_id", "video_id", "timestamp", "watch_ratio"],
-            columns=["UserID", "ItemID", "Timestamp", "WatchRatio"],
-            types=[int, int, float, float],
-            header=0,
-        )
-        interactions = pd.concat([interactions_big, interactions_small], axis=0)
-        print(interactions)
-        interactions = interactions[interactions["WatchRatio"] >= 2.0]
-        interactions = interactions.drop(columns=["WatchRatio"])
+        interactions = []
+        for file_name in ["big_matrix.csv", "small_matrix.csv"]:
+            matrix = (
+                pd.read_csv(
+                    os.path.join(raw_dir, file_name),
+                    sep=",",
+                    header=0,
+                    usecols=list(self._DTYPE_MAP),
+                    dtype=self._DTYPE_MAP,
+                    encoding="utf-8",
+                    encoding_errors="replace",
+                    engine="c",
+                    memory_map=True,
+                )
+                .rename(columns=self._COLUMN_MAP)
+                .dropna()
+            )
+            # filter out the negative interactions before merging the matrices
+            matrix = matrix.loc[
+                matrix["WatchRatio"].values >= 2.0, ["UserID", "ItemID", "Timestamp"]
+            ]
+            interactions.append(matrix)
+        interactions = pd.concat(interactions, axis=0, ignore_index=True)
         # NOTE: Not convert to second timestamp, remain as milliseconds
         # interactions["Timestamp"] = interactions["Timestamp"].astype("int64")
         return interactions, None
+
+    def _load_data_arrow(self) -> tuple[pd.DataFrame, None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but keep
+        the data in Arrow until the end. Both matrices are parsed by
+        :func:`read_csv_arrow`, concatenated by ``pa.concat_tables`` without
+        copying the column chunks, and filtered by the watch ratio with
+        ``pyarrow.compute``. Only the remaining rows are converted to a Pandas
+        DataFrame, which happens once and releases the Arrow buffers on the
+        way.
+
+        .. note::
+            This method requires the optional ``pyarrow`` package, and is used
+            by :meth:`_load_data` automatically if ``pyarrow`` is installed
+            but ``polars`` is not.
+
+        Returns:
+            tuple[pd.DataFrame, None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles (``None``).
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        table = pa.concat_tables(
+            [
+                read_csv_arrow(
+                    os.path.join(raw_dir, file_name),
+                    ",",
+                    list(self._DTYPE_MAP),
+                    list(self._COLUMN_MAP.values()),
+                    list(self._DTYPE_MAP.values()),
+                )
+                for file_name in ["big_matrix.csv", "small_matrix.csv"]
+            ]
+        )
+        table = table.filter(pc.greater_equal(table["WatchRatio"], 2.0))
+        interactions = table.select(["UserID", "ItemID", "Timestamp"]).to_pandas(
+            split_blocks=True, self_destruct=True
+        )
+        return interactions, None
+
+    def _load_data_polars(self) -> tuple[pd.DataFrame, None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but with
+        a ``polars`` lazy query. The CSV scans of both matrices, column
+        selection, blank value filtering and watch ratio filtering are fused
+        into a single multi-threaded execution, and the result is converted
+        to a Pandas DataFrame only once at the end.
+
+        .. note::
+            This method requires the optional ``polars`` package, and is used
+            by :meth:`_load_data` automatically if ``polars`` is installed.
+
+        Returns:
+            tuple[pd.DataFrame, None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles (``None``).
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        matrices = [
+            pl.scan_csv(
+                os.path.join(raw_dir, file_name),
+                schema_overrides={
+                    "user_id": pl.Int32,
+                    "video_id": pl.Int32,
+                    "timestamp": pl.Float64,
+                    "watch_ratio": pl.Float64,
+                },
+            ).select(
+                pl.col("user_id").alias("UserID"),
+                pl.col("video_id").alias("ItemID"),
+                pl.col("timestamp").alias("Timestamp"),
+                pl.col("watch_ratio").alias("WatchRatio"),
+            )
+            for file_name in ["big_matrix.csv", "small_matrix.csv"]
+        ]
+        interactions = (
+            pl.concat(matrices)
+            .drop_nulls()
+            .filter(pl.col("WatchRatio") >= 2.0)
+            .drop("WatchRatio")
+            .collect()
+            .to_pandas()
+        )
+        return interactions, None
@@ -3,64 +3,69 @@ r"""Movielens dataset processor.
 Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
+import csv
+import functools
+import multiprocessing
 import os
-from typing import Any
+import re
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
+from process_data.io import CHUNK_SIZE, open_sequential, read_csv
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 __all__ = [
     "MovielensDatasetProcessor",
 ]
 
+# the release years in the movie titles, e.g., `` (1995)`` in ``Toy Story (1995)``
+_YEAR_RE = re.compile(r"\s*\(\d{4}\)")
+
 
-def read_csv(
-    file_path: str,
+def replace_delimiter(
+    src_path: str,
+    dst_path: str,
     delimiter: str,
-    columns: list[str] | None = None,
-    types: list[Any] | None = None,
-    header: int | None = None,
-) -> pd.DataFrame:
-    r"""Read a CSV file and return a DataFrame. If ``columns`` is not ``None``,
-    the columns will be renamed to the specified names ``columns``. Each
-    column will be converted to the specified type in ``types``. If ``types``
-    is ``None``, the columns will be automatically inferred by Pandas. In
-    addition, the columns with blank values will be dropped.
+    new_delimiter: str = "\t",
+    chunk_size: int = 1 << 20,
+) -> None:
+    r"""Copy a delimited text file with the delimiter replaced, e.g., from the
+    ``::`` of the Movielens-1M/10M ``.dat`` files to ``\t``, so that the copy
+    can be parsed by the fast single-character parsers. The file is streamed
+    in chunks of whole lines, and the copy is written atomically.
 
     Args:
-        file_path (str):
-            The path of the CSV file.
+        src_path (str):
+            The path of the source file.
+        dst_path (str):
+            The path of the copy.
         delimiter (str):
-            The delimiter of the CSV file.
-        columns (list[str] | None, optional, default=None):
-            The column names to rename the columns to. If ``None``, no renaming
-            will be performed. The default value is ``None``.
-        types (list[Any], optional, default=None):
-            The types to convert the columns to. If ``None``, the columns
-            will be automatically inferred by Pandas. The default value is
-            ``None``.
-        header (int | None, optional, default=None):
-            The row number to use as the column names. If ``None``, no row
-            will be used as the column names. The default value is ``None``.
-
-    Returns:
-        The DataFrame containing the data from the CSV file.
+            The delimiter of the source file.
+        new_delimiter (str, optional, default="\t"):
+            The delimiter of the copy. The default value is ``\t``.
+        chunk_size (int, optional, default=1 << 20):
+            The number of bytes to read at a time. The default value is 1 MiB.
     """
-    if types is not None:
-        types = {col: typ for col, typ in zip(columns, types)}
-    df = pd.read_csv(
-        file_path,
-        sep=delimiter,
-        header=header,
-        names=columns,
-        dtype=types,
-        encoding="utf-8",
-        encoding_errors="replace",
-        engine="python",
-    )
-    df = df.dropna()
-    return df
+    old_bytes, new_bytes = delimiter.encode(), new_delimiter.encode()
+    tmp_path = f"{dst_path}.tmp"
+    with open_sequential(src_path) as src, open(tmp_path, "wb") as dst:
+        rest = b""
+        while chunk := src.read(chunk_size):
+            # a delimiter may be split across chunks, so only replace in the
+            # complete lines and keep the rest for the next chunk
+            chunk = rest + chunk
+            end = chunk.rfind(b"\n") + 1
+            dst.write(chunk[:end].replace(old_bytes, new_bytes))
+            rest = chunk[end:]
+        dst.write(rest.replace(old_bytes, new_bytes))
+    os.replace(tmp_path, dst_path)
 
 
 class MovielensDatasetProcessor(BaseDatasetProcessor):
@@ -76,7 +81,10 @@ class MovielensDatasetProcessor(BaseDatasetProcessor):
     .. note::
         The Movielens-1M/10M dataset's ``.dat`` files use ``::`` as the
         delimiter and have no header, while the Movielens-20M/25M/32M dataset's
-        ``.csv`` files use ``,`` as the delimiter and have a header.
+        ``.csv`` files use ``,`` as the delimiter and have a header. Since the
+        fast parsers only support single-character delimiters, the ``.dat``
+        files are converted to ``.tsv`` files in the ``dataset_dir/raw/.cache``
+        directory once, and the converted files are reused afterwards.
 
     .. note::
         All movie titles are in the format of ``Title (Year)``, where ``Year`` is a
@@ -127,6 +135,48 @@ class MovielensDatasetProcessor(BaseDatasetProcessor):
                 f"25m, or 32m)."
             )
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        raw_files = [os.path.join(raw_dir, f"ratings{self.file_suffix}")]
+        if self.meta_available:
+            raw_files.append(os.path.join(raw_dir, f"movies{self.file_suffix}"))
+        return raw_files
+
+    def _raw_path(self, file_name: str) -> tuple[str, str]:
+        r"""Return the path and delimiter to parse the raw data file
+        ``file_name`` (e.g., ``ratings``) with. The files with the ``::``
+        delimiter are converted to tab-separated files by
+        :func:`replace_delimiter` first, unless the converted file is newer
+        than the raw file already.
+
+        Args:
+            file_name (str):
+                The name of the raw data file without the suffix.
+
+        Returns:
+            tuple[str, str]:
+                The path of the file to parse, and its delimiter.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        raw_path = os.path.join(raw_dir, f"{file_name}{self.file_suffix}")
+        if len(self.delimiter) == 1:
+            return raw_path, self.delimiter
+        cache_dir = os.path.join(raw_dir, ".cache")
+        tsv_path = os.path.join(cache_dir, f"{file_name}.tsv")
+        if (
+            not os.path.exists(tsv_path)
+            or os.path.getmtime(tsv_path) <= os.path.getmtime(raw_path)
+        ):
+            os.makedirs(cache_dir, exist_ok=True)
+            replace_delimiter(raw_path, tsv_path, self.delimiter)
+        return tsv_path, "\t"
+
     def _load_data(self) -> tuple[pd.DataFrame, pd.DataFrame | None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
@@ -146,30 +196,122 @@ class MovielensDatasetProcessor(BaseDatasetProcessor):
                 second element is the item titles. If ``meta_available`` is
                 ``False``, the second element will be ``None``.
         """
-        raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions = read_csv(
-            os.path.join(raw_dir, f"ratings{self.file_suffix}"),
-            delimiter=self.delimiter,
-            columns=["UserID", "ItemID", "Rating", "Timestamp"],
-            types=[int, int, int, str],
-            header=self.header,
-        )
-        interactions = interactions[["UserID", "ItemID", "Timestamp"]]
-        interactions["Timestamp"] = interactions["Timestamp"].astype("int64")
-        if self.meta_available:
-            item2title = read_csv(
-                os.path.join(raw_dir, f"movies{self.file_suffix}"),
-                delimiter=self.delimiter,
-                columns=["ItemID", "Title", "Genres"],
-                types=[int, str, str],
+        if pl is not None:
+            return self._load_data_polars()
+        ratings_path, delimiter = self._raw_path("ratings")
+        # the quote characters are not special in the converted files
+        quoting = csv.QUOTE_MINIMAL if delimiter == self.delimiter else csv.QUOTE_NONE
+        item2title_future = None
+        # the worker is spawned, since forking is not safe once the thread
+        # pools of the optional readers are running
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            if self.meta_available:
+                movies_path, movies_delimiter = self._raw_path("movies")
+                read_item2title = functools.partial(
+                    read_csv,
+                    movies_path,
+                    delimiter=movies_delimiter,
+                    columns=["ItemID", "Title", "Genres"],
+                    types=[np.int32, str, str],
+                    header=self.header,
+                    sel_cols=["ItemID", "Title"],
+                    quoting=quoting,
+                )
+                # spawning a worker takes up to a second, so only a large movies
+                # file is parsed in a worker process meanwhile
+                if os.path.getsize(movies_path) >= 2 * CHUNK_SIZE:
+                    item2title_future = executor.submit(read_item2title)
+            interactions = read_csv(
+                ratings_path,
+                delimiter=delimiter,
+                columns=["UserID", "ItemID", "Rating", "Timestamp"],
+                types=[np.int32, np.int32, float, np.int32],
                 header=self.header,
+                sel_cols=["UserID", "ItemID", "Timestamp"],
+                quoting=quoting,
             )
-            item2title = item2title[["ItemID", "Title"]]
-            item2title = item2title[
-                item2title["Title"].notna() & item2title["Title"] != "nan"
-            ]
-            item2title["Title"] = item2title["Title"].str.replace(
-                r"\s*\(\d{4}\)", "", regex=True
+            if self.meta_available:
+                item2title = (
+                    item2title_future.result()
+                    if item2title_future is not None
+                    else read_item2title()
+                )
+                item2title = item2title.loc[
+                    item2title["Title"].notna() & item2title["Title"].ne("nan")
+                ]
+                item2title["Title"] = item2title["Title"].map(
+                    lambda title: _YEAR_RE.sub("", title)
+                )
+            else:
+                item2title = None
+        return interactions, item2title
+
+    def _load_data_polars(self) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but with
+        ``polars`` lazy queries. The CSV scan, column selection, blank value
+        filtering and title cleaning are executed by the multi-threaded
+        ``polars`` engine, and the results are converted to Pandas DataFrames
+        only once at the end.
+
+        .. note::
+            This method requires the optional ``polars`` package, and is used
+            by :meth:`_load_data` automatically if ``polars`` is installed.
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame | None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles. If ``meta_available`` is
+                ``False``, the second element will be ``None``.
+        """
+        ratings_path, delimiter = self._raw_path("ratings")
+        # the quote characters are not special in the converted files
+        quote_char = '"' if delimiter == self.delimiter else None
+        interactions = (
+            pl.scan_csv(
+                ratings_path,
+                separator=delimiter,
+                has_header=self.header is not None,
+                quote_char=quote_char,
+                new_columns=["UserID", "ItemID", "Rating", "Timestamp"],
+                schema_overrides={
+                    "UserID": pl.Int32,
+                    "ItemID": pl.Int32,
+                    "Rating": pl.Float64,
+                    "Timestamp": pl.Int32,
+                },
+                # the ratings are ASCII, so the (faster) strict decoding is safe
+                encoding="utf8",
+            )
+            .select("UserID", "ItemID", "Timestamp")
+            .drop_nulls()
+            .collect()
+            .to_pandas()
+        )
+        if self.meta_available:
+            movies_path, delimiter = self._raw_path("movies")
+            item2title = (
+                pl.scan_csv(
+                    movies_path,
+                    separator=delimiter,
+                    has_header=self.header is not None,
+                    quote_char=quote_char,
+                    new_columns=["ItemID", "Title", "Genres"],
+                    schema_overrides={
+                        "ItemID": pl.Int32,
+                        "Title": pl.String,
+                        "Genres": pl.String,
+                    },
+                    # some titles are not UTF-8, e.g., Latin-1 in ml-1m
+                    encoding="utf8-lossy",
+                )
+                .select("ItemID", "Title")
+                .drop_nulls()
+                .filter(pl.col("Title") != "nan")
+                .with_columns(pl.col("Title").str.replace_all(_YEAR_RE.pattern, ""))
+                .collect()
+                .to_pandas()
             )
         else:
             item2title = None
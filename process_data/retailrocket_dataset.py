@@ -4,72 +4,30 @@ Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
 import os
-from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
+from process_data.io import read_csv
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa, pc, pa_csv = None, None, None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 __all__ = [
     "RetailRocketDatasetProcessor",
 ]
 
 
-def read_csv(
-    file_path: str,
-    delimiter: str,
-    sel_cols: list[int] | list[str] | None = None,
-    columns: list[str] | None = None,
-    types: list[Any] | None = None,
-    header: int | None = None,
-) -> pd.DataFrame:
-    r"""Read a CSV file and return a DataFrame. Only the columns specified in
-    ``select_cols`` will be read. The columns are renamed to the specified
-    names ``columns``, which should be a list of strings. Each column will be
-    converted to the specified type in ``types``. If ``types`` is ``None``,
-    the columns will be automatically inferred by Pandas. In addition, the
-    columns with blank values will be dropped.
-
-    Args:
-        file_path (str):
-            The path of the CSV file.
-        delimiter (str):
-            The delimiter of the CSV file.
-        select_cols (list[int] | list[str] | None, optional, default=None):
-            The columns to select from the CSV file. If ``None``, all columns
-            will be selected. The default value is ``None``.
-        columns (list[str] | None, optional, default=None):
-            The column names to rename the columns to. If ``None``, no renaming
-            will be performed. The default value is ``None``.
-        types (list[Any], optional, default=None):
-            The types to convert the columns to. If ``None``, the columns
-            will be automatically inferred by Pandas. The default value is
-            ``None``.
-        header (int | None, optional, default=None):
-            The row number to use as the column names. If ``None``, no row
-            will be used as the column names. The default value is ``None``.
-
-    Returns:
-        The DataFrame containing the data from the CSV file.
-    """
-    df = pd.read_csv(
-        file_path,
-        sep=delimiter,
-        header=header,
-        usecols=sel_cols,
-        encoding="utf-8",
-        encoding_errors="replace",
-        engine="python",
-    )
-    if columns is not None:
-        df.columns = columns
-    if types is not None:
-        types = {col: typ for col, typ in zip(columns, types)}
-        df = df.astype(types)
-    df = df.dropna()
-    return df
-
-
 class RetailRocketDatasetProcessor(BaseDatasetProcessor):
     r"""Processor for the RetailRocket dataset.
 
@@ -111,6 +69,16 @@ class RetailRocketDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, False, k_core, sample_user_size)
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        return [os.path.join(raw_dir, "events.csv")]
+
     def _load_data(self) -> tuple[pd.DataFrame, None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
@@ -126,15 +94,106 @@ class RetailRocketDatasetProcessor(BaseDatasetProcessor):
                 The first element is the user-item interaction data, and the
                 second element is the item titles (``None``).
         """
+        if pl is not None:
+            return self._load_data_polars()
+        if pa is not None:
+            return self._load_data_arrow()
         raw_dir = os.path.join(self.dataset_dir, "raw")
         interactions = read_csv(
             os.path.join(raw_dir, "events.csv"),
             delimiter=",",
-            sel_cols=["timestamp", "visitorid", "event", "itemid"],
-            columns=["Timestamp", "UserID", "Event", "ItemID"],
-            types=[int, int, str, int],
+            columns=["Timestamp", "UserID", "Event", "ItemID", "TransactionID"],
+            # the event is compared as the category code rather than strings, and
+            # the 13-digit timestamps (in milliseconds) do not fit in int32
+            types=[np.int64, np.int32, "category", np.int32, str],
             header=0,
+            sel_cols=["Timestamp", "UserID", "Event", "ItemID"],
+        )
+        interactions = interactions.loc[
+            interactions["Event"] == "view", ["UserID", "ItemID", "Timestamp"]
+        ]
+        return interactions, None
+
+    def _load_data_polars(self) -> tuple[pd.DataFrame, None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but with
+        a ``polars`` lazy query. The CSV scan, column selection, blank value
+        filtering and event filtering are fused into a single multi-threaded
+        execution, and the result is converted to a Pandas DataFrame only once
+        at the end.
+
+        .. note::
+            This method requires the optional ``polars`` package, and is used
+            by :meth:`_load_data` automatically if ``polars`` is installed.
+
+        Returns:
+            tuple[pd.DataFrame, None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles (``None``).
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        interactions = (
+            pl.scan_csv(
+                os.path.join(raw_dir, "events.csv"),
+                schema_overrides={
+                    "timestamp": pl.Int64,
+                    "visitorid": pl.Int32,
+                    "event": pl.String,
+                    "itemid": pl.Int32,
+                },
+                # the events are ASCII, so the (faster) strict decoding is safe
+                encoding="utf8",
+            )
+            .select("timestamp", "visitorid", "event", "itemid")
+            .drop_nulls()
+            .filter(pl.col("event") == "view")
+            .select(
+                pl.col("visitorid").alias("UserID"),
+                pl.col("itemid").alias("ItemID"),
+                pl.col("timestamp").alias("Timestamp"),
+            )
+            .collect()
+            .to_pandas()
+        )
+        return interactions, None
+
+    def _load_data_arrow(self) -> tuple[pd.DataFrame, None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but with
+        the multi-threaded PyArrow CSV reader. The ``event`` column is parsed
+        as a dictionary-encoded column, so that the ``view`` events are
+        filtered by comparing the integer codes, and the column is dropped
+        before the conversion to a Pandas DataFrame.
+
+        .. note::
+            This method requires the optional ``pyarrow`` package, and is used
+            by :meth:`_load_data` automatically if ``pyarrow`` is installed
+            but ``polars`` is not.
+
+        Returns:
+            tuple[pd.DataFrame, None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles (``None``).
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        with pa.memory_map(os.path.join(raw_dir, "events.csv"), "r") as source:
+            table = pa_csv.read_csv(
+                source,
+                read_options=pa_csv.ReadOptions(use_threads=True, block_size=32 << 20),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=["timestamp", "visitorid", "event", "itemid"],
+                    column_types={
+                        "timestamp": pa.int64(),
+                        "visitorid": pa.int32(),
+                        # the CSV reader only supports int32 dictionary indices
+                        "event": pa.dictionary(pa.int32(), pa.string()),
+                        "itemid": pa.int32(),
+                    },
+                ),
+            )
+        table = table.drop_null()
+        table = table.filter(pc.equal(table["event"], "view"))
+        interactions = (
+            table.select(["visitorid", "itemid", "timestamp"])
+            .rename_columns(["UserID", "ItemID", "Timestamp"])
+            .to_pandas(split_blocks=True, self_destruct=True)
         )
-        interactions = interactions[interactions["Event"] == "view"]
-        interactions = interactions[["UserID", "ItemID", "Timestamp"]]
         return interactions, None
@@ -3,68 +3,21 @@ r"""Steam Dataset Processor for SeqRecBenchmark.
 Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
-import ast
+import functools
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import pandas as pd
 
-from process_data.base_dataset import BaseDatasetProcessor
+from process_data.base_dataset import BaseDatasetProcessor, dates_to_epoch
+from process_data.io import CHUNK_SIZE, read_literal_json
 
 __all__ = [
     "SteamDatasetProcessor",
 ]
 
 
-def read_json(
-    file_path: str, selected_cols: list[str] | None = None, standard: bool = True
-) -> pd.DataFrame:
-    r"""Read a JSON file and return a DataFrame. Note that only the columns
-    specified in ``selected_cols`` will be selected. If ``selected_cols`` is
-    ``None``, all columns will be selected. The rows with blank values in the
-    selected columns will be dropped.
-
-    .. warning::
-        If the ``selected_cols`` contains a column that is not in the JSON
-        file, an ``KeyError`` will be raised.
-
-    Args:
-        file_path (str):
-            The path of the JSON file.
-        selected_cols (list[str], optional, default=None):
-            The columns to select from the JSON file. If ``None``, all
-            columns will be selected. The default value is ``None``.
-            Note that if the selected columns remain blank in a row, this
-            row will be dropped.
-        standard (bool, optional, default=True):
-            Whether the file is in the standard JSON format. If ``False``,
-            we assume that each row is a Python literal (e.g., a dictionary).
-            The default value is ``True``.
-
-    Returns:
-        The DataFrame containing the data from the JSON file.
-    """
-    if standard:
-        df = pd.read_json(file_path, lines=True)
-    else:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        data = []
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data.append(ast.literal_eval(line))
-            except Exception as error:
-                print(f"Error parsing line: {line}")
-                print(f"Error message: {error}")
-        df = pd.DataFrame(data)
-    if selected_cols is not None:
-        df = df[selected_cols]
-    df = df.dropna()
-    return df
-
-
 class SteamDatasetProcessor(BaseDatasetProcessor):
     r"""Processor for the Steam dataset.
 
@@ -115,6 +68,40 @@ class SteamDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, meta_available, k_core, sample_user_size)
 
+    def _convert_timestamps(self, interactions: pd.DataFrame) -> pd.DataFrame:
+        r"""Convert the date strings of the remaining interactions to the unix
+        time in seconds. The conversion is deferred from :meth:`_load_data`
+        to after the K-core filtering, and the repeated dates are parsed only
+        once by :func:`dates_to_epoch`.
+
+        Args:
+            interactions (pd.DataFrame):
+                The user-item interaction data.
+
+        Returns:
+            pd.DataFrame:
+                The user-item interaction data with the unix timestamps.
+        """
+        interactions = interactions.copy()
+        # the seconds since the epoch fit in int32 until 2038
+        interactions["Timestamp"] = dates_to_epoch(
+            interactions["Timestamp"], format="%Y-%m-%d"
+        ).astype("int32")
+        return interactions
+
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        raw_files = [os.path.join(raw_dir, "steam_reviews.json")]
+        if self.meta_available:
+            raw_files.append(os.path.join(raw_dir, "steam_games.json"))
+        return raw_files
+
     def _load_data(self) -> tuple[pd.DataFrame, pd.DataFrame | None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
@@ -135,28 +122,44 @@ class SteamDatasetProcessor(BaseDatasetProcessor):
                 ``False``, the second element will be ``None``.
         """
         raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions = read_json(
-            os.path.join(raw_dir, "steam_reviews.json"),
-            selected_cols=["username", "product_id", "date"],
-            standard=False,
-        )
-        interactions.columns = ["UserID", "ItemID", "Timestamp"]
-        interactions["Timestamp"] = pd.to_datetime(
-            interactions["Timestamp"], format="%Y-%m-%d"
-        )
-        interactions["Timestamp"] = interactions["Timestamp"].astype("int64") // 10**9
-        interactions["ItemID"] = interactions["ItemID"].astype("str")
-        if self.meta_available:
-            item2title = read_json(
-                os.path.join(raw_dir, "steam_games.json"),
-                selected_cols=["id", "title"],
-                standard=False,
+        item2title_future = None
+        # the worker is spawned, since forking is not safe once the thread
+        # pools of the optional readers are running
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            if self.meta_available:
+                games_path = os.path.join(raw_dir, "steam_games.json")
+                read_item2title = functools.partial(
+                    read_literal_json, games_path, selected_cols=["id", "title"]
+                )
+                # spawning a worker takes up to a second, so only a large games
+                # file is parsed in a worker process meanwhile
+                if os.path.getsize(games_path) >= 2 * CHUNK_SIZE:
+                    item2title_future = executor.submit(read_item2title)
+            interactions = read_literal_json(
+                os.path.join(raw_dir, "steam_reviews.json"),
+                selected_cols=["username", "product_id", "date"],
+            )
+            interactions.columns = ["UserID", "ItemID", "Timestamp"]
+            # the string IDs are encoded once as categories
+            interactions["UserID"] = interactions["UserID"].astype("category")
+            interactions["ItemID"] = (
+                interactions["ItemID"].astype("str").astype("category")
             )
-            item2title.columns = ["ItemID", "Title"]
-            item2title["ItemID"] = item2title["ItemID"].astype("str")
-            item2title = item2title[
-                item2title["Title"].notna() & item2title["Title"] != "nan"
-            ]
-        else:
-            item2title = None
+            if self.meta_available:
+                item2title = (
+                    item2title_future.result()
+                    if item2title_future is not None
+                    else read_item2title()
+                )
+                item2title.columns = ["ItemID", "Title"]
+                item2title["ItemID"] = (
+                    item2title["ItemID"].astype("str").astype("category")
+                )
+                item2title = item2title.loc[
+                    item2title["Title"].notna() & item2title["Title"].ne("nan")
+                ]
+            else:
+                item2title = None
         return interactions, item2title
@@ -3,43 +3,26 @@ r"""Yelp Dataset Processor for SeqRecBenchmark.
 Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
-import ast
+import functools
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import pandas as pd
 
-from process_data.base_dataset import BaseDatasetProcessor
+from process_data.base_dataset import BaseDatasetProcessor, dates_to_epoch
+from process_data.io import CHUNK_SIZE, read_json
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 __all__ = [
     "YelpDatasetProcessor",
 ]
 
 
-def read_json(file_path: str, selected_cols: list[str] | None = None) -> pd.DataFrame:
-    r"""Read a JSON file and return a DataFrame. Note that only the columns
-    specified in ``selected_cols`` will be selected. If ``selected_cols`` is
-    ``None``, all columns will be selected. The rows with blank values in the
-    selected columns will be dropped.
-
-    Args:
-        file_path (str):
-            The path of the JSON file.
-        selected_cols (list[str], optional, default=None):
-            The columns to select from the JSON file. If ``None``, all
-            columns will be selected. The default value is ``None``.
-            Note that if the selected columns remain blank in a row, this
-            row will be dropped.
-
-    Returns:
-        The DataFrame containing the data from the JSON file.
-    """
-    df = pd.read_json(file_path, lines=True)
-    if selected_cols is not None:
-        df = df[selected_cols]
-    df = df.dropna()
-    return df
-
-
 class YelpDatasetProcessor(BaseDatasetProcessor):
     r"""Processor for the Yelp dataset (2018 & 2022 versions).
 
@@ -97,6 +80,43 @@ class YelpDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, meta_available, k_core, sample_user_size)
 
+    def _convert_timestamps(self, interactions: pd.DataFrame) -> pd.DataFrame:
+        r"""Convert the date strings of the remaining interactions to the unix
+        time in seconds. The conversion is deferred from :meth:`_load_data`
+        to after the K-core filtering, and the repeated dates are parsed only
+        once by :func:`dates_to_epoch`.
+
+        Args:
+            interactions (pd.DataFrame):
+                The user-item interaction data.
+
+        Returns:
+            pd.DataFrame:
+                The user-item interaction data with the unix timestamps.
+        """
+        interactions = interactions.copy()
+        # the dates may also contain the time of day (e.g., in Yelp2022), and
+        # the seconds since the epoch fit in int32 until 2038
+        interactions["Timestamp"] = dates_to_epoch(
+            interactions["Timestamp"], format="ISO8601"
+        ).astype("int32")
+        return interactions
+
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        raw_files = [os.path.join(raw_dir, "yelp_academic_dataset_review.json")]
+        if self.meta_available:
+            raw_files.append(
+                os.path.join(raw_dir, "yelp_academic_dataset_business.json")
+            )
+        return raw_files
+
     def _load_data(self) -> tuple[pd.DataFrame, pd.DataFrame | None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
@@ -116,23 +136,100 @@ class YelpDatasetProcessor(BaseDatasetProcessor):
                 second element is the item titles. If ``meta_available`` is
                 ``False``, the second element will be ``None``.
         """
+        if pl is not None:
+            return self._load_data_polars()
         raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions = read_json(
-            os.path.join(raw_dir, "yelp_academic_dataset_review.json"),
-            selected_cols=["user_id", "business_id", "date"],
-        )
-        interactions.columns = ["UserID", "ItemID", "Timestamp"]
-        interactions["Timestamp"] = pd.to_datetime(
-            interactions["Timestamp"], format="%Y-%m-%d"
+        item2title_future = None
+        # the worker is spawned, since forking is not safe once the thread
+        # pools of the optional readers are running
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            if self.meta_available:
+                business_path = os.path.join(
+                    raw_dir, "yelp_academic_dataset_business.json"
+                )
+                read_item2title = functools.partial(
+                    read_json,
+                    business_path,
+                    selected_cols=["business_id", "name"],
+                    categorical_cols=["business_id"],
+                )
+                # spawning a worker takes up to a second, so only a large
+                # business file is parsed in a worker process meanwhile
+                if os.path.getsize(business_path) >= 2 * CHUNK_SIZE:
+                    item2title_future = executor.submit(read_item2title)
+            interactions = read_json(
+                os.path.join(raw_dir, "yelp_academic_dataset_review.json"),
+                selected_cols=["user_id", "business_id", "date"],
+                categorical_cols=["user_id", "business_id"],
+            )
+            interactions.columns = ["UserID", "ItemID", "Timestamp"]
+            if self.meta_available:
+                item2title = (
+                    item2title_future.result()
+                    if item2title_future is not None
+                    else read_item2title()
+                )
+                item2title.columns = ["ItemID", "Title"]
+                item2title = item2title.loc[
+                    item2title["Title"].notna() & item2title["Title"].ne("nan")
+                ]
+            else:
+                item2title = None
+        return interactions, item2title
+
+    def _load_data_polars(self) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but with
+        ``polars`` lazy queries. Only the selected fields of the JSON lines are
+        parsed by the multi-threaded NDJSON reader, and the blank values are
+        filtered by ``polars`` before the results are converted to Pandas
+        DataFrames.
+
+        .. note::
+            This method requires the optional ``polars`` package, and is used
+            by :meth:`_load_data` automatically if ``polars`` is installed.
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame | None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles. If ``meta_available`` is
+                ``False``, the second element will be ``None``.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        interactions = (
+            pl.scan_ndjson(
+                os.path.join(raw_dir, "yelp_academic_dataset_review.json"),
+                schema={
+                    "user_id": pl.String,
+                    "business_id": pl.String,
+                    "date": pl.String,
+                },
+            )
+            .drop_nulls()
+            .select(
+                pl.col("user_id").cast(pl.Categorical).alias("UserID"),
+                pl.col("business_id").cast(pl.Categorical).alias("ItemID"),
+                pl.col("date").alias("Timestamp"),
+            )
+            .collect()
+            .to_pandas()
         )
-        interactions["Timestamp"] = interactions["Timestamp"].astype("int64") // 10**9
         if self.meta_available:
-            item2title = read_json(
-                os.path.join(raw_dir, "yelp_academic_dataset_business.json"),
-                selected_cols=["business_id", "name"],
+            item2title = (
+                pl.scan_ndjson(
+                    os.path.join(raw_dir, "yelp_academic_dataset_business.json"),
+                    schema={"business_id": pl.String, "name": pl.String},
+                )
+                .drop_nulls()
+                .filter(pl.col("name") != "nan")
+                .select(
+                    pl.col("business_id").cast(pl.Categorical).alias("ItemID"),
+                    pl.col("name").alias("Title"),
+                )
+                .collect()
+                .to_pandas()
             )
-            item2title.columns = ["ItemID", "Title"]
-            item2title = item2title[
-                item2title["Title"].notna() & item2title["Title"] != "nan"
-            ]
+        else:
+            item2title = None
         return interactions, item2title
@@ -3,71 +3,276 @@ r"""YooChoose Dataset Processor for SeqRecBenchmark.
 Copyright (c) 2025 Weiqin Yang (Tiny Snow) & Yue Pan @ Zhejiang University
 """
 
+import io
+import itertools
+import multiprocessing
 import os
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Final
 
+import numpy as np
 import pandas as pd
 
 from process_data.base_dataset import BaseDatasetProcessor
+from process_data.io import CHUNK_SIZE, open_sequential, read_csv
+
+try:
+    import numba as nb
+except ImportError:
+    nb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
 
 __all__ = [
     "YooChooseDatasetProcessor",
 ]
 
+# the lower bounds and the ranges of the bytes of the ISO 8601 timestamps
+_ISO_MS_LOW: Final[np.ndarray] = np.frombuffer(
+    b"0000-00-00T00:00:00.000Z", dtype=np.uint8
+)
+_ISO_MS_SPAN: Final[np.ndarray] = (
+    np.frombuffer(b"9999-99-99T99:99:99.999Z", dtype=np.uint8) - _ISO_MS_LOW
+)
+# the number of days in each month (1-12) of a common year
+_DAYS_IN_MONTH: Final[np.ndarray] = np.array(
+    [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64
+)
+
+
+if nb is not None:
+
+    @nb.njit(cache=True, inline="always")
+    def _digits(row: np.ndarray, pos: int, num: int) -> int:
+        r"""Parse the ``num`` ASCII digits at ``row[pos:pos + num]``."""
+        value = 0
+        for j in range(pos, pos + num):
+            value = value * 10 + (np.int64(row[j]) - 48)
+        return value
+
+    @nb.njit(cache=True, inline="always")
+    def _days_in_month(y: int, m: int) -> int:
+        r"""Return the number of days in the month ``m`` of the year ``y``."""
+        if m == 2:
+            return 29 if y % 4 == 0 and (y % 100 != 0 or y % 400 == 0) else 28
+        return 30 if m == 4 or m == 6 or m == 9 or m == 11 else 31
+
+    @nb.njit(parallel=True, cache=True)
+    def _iso_to_epoch_ms_kernel(buf: np.ndarray) -> tuple[np.ndarray, int]:
+        r"""Convert the fixed-width ``%Y-%m-%dT%H:%M:%S.%fZ`` timestamps with
+        milliseconds to the unix time in milliseconds. Each row of ``buf``
+        contains the 24 ASCII bytes of one timestamp. A row is malformed if it
+        has any unexpected byte or any field out of range (e.g., month 13 or
+        February 30). The date is converted to days since epoch by the
+        ``days_from_civil`` algorithm of Howard Hinnant.
+
+        Returns:
+            tuple[np.ndarray, int]:
+                The unix timestamps, and the number of malformed rows.
+        """
+        n = buf.shape[0]
+        out = np.zeros(n, dtype=np.int64)
+        invalid = 0
+        for i in nb.prange(n):
+            row = buf[i]
+            bad = (
+                row[4] != 45  # "-"
+                or row[7] != 45  # "-"
+                or row[10] != 84  # "T"
+                or row[13] != 58  # ":"
+                or row[16] != 58  # ":"
+                or row[19] != 46  # "."
+                or row[23] != 90  # "Z"
+            )
+            for j in range(23):
+                if j != 4 and j != 7 and j != 10 and j != 13 and j != 16 and j != 19:
+                    bad = bad or row[j] < 48 or row[j] > 57
+            y = _digits(row, 0, 4)
+            m = _digits(row, 5, 2)
+            d = _digits(row, 8, 2)
+            hour = _digits(row, 11, 2)
+            minute = _digits(row, 14, 2)
+            second = _digits(row, 17, 2)
+            # the calendar ranges, where a leap second (60) is allowed
+            bad = (
+                bad
+                or m < 1
+                or m > 12
+                or d < 1
+                or d > _days_in_month(y, m)
+                or hour > 23
+                or minute > 59
+                or second > 60
+            )
+            if bad:
+                invalid += 1
+                continue
+            y -= m <= 2
+            era = y // 400
+            yoe = y - era * 400
+            doy = (153 * (m - 3 if m > 2 else m + 9) + 2) // 5 + d - 1
+            doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+            days = era * 146097 + doe - 719468
+            out[i] = (
+                days * 86400000
+                + hour * 3600000
+                + minute * 60000
+                + second * 1000
+                + _digits(row, 20, 3)
+            )
+        return out, invalid
+
+
+def _iso_to_epoch_ms_numpy(buf: np.ndarray) -> tuple[np.ndarray, int]:
+    r"""Convert the timestamps in the same way as ``_iso_to_epoch_ms_kernel``,
+    but with the vectorized NumPy operations over the columns of ``buf``.
+
+    Returns:
+        tuple[np.ndarray, int]:
+            The unix timestamps, and the number of malformed rows.
+    """
+    # each row of the mask is viewed as 3 words of 8 bytes, which are or-reduced
+    bad = ((buf - _ISO_MS_LOW) > _ISO_MS_SPAN).view(np.uint64)
+    bad = (bad[:, 0] | bad[:, 1] | bad[:, 2]) != 0
+    digits = buf - np.uint8(48)
+
+    def number(start: int, stop: int) -> np.ndarray:
+        value = digits[:, start].astype(np.int64)
+        for j in range(start + 1, stop):
+            value *= 10
+            value += digits[:, j]
+        return value
+
+    y = number(0, 4)
+    m = number(5, 7)
+    d = number(8, 10)
+    hour = number(11, 13)
+    minute = number(14, 16)
+    second = number(17, 19)
+    # the calendar ranges, where a leap second (60) is allowed
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    month_days = _DAYS_IN_MONTH[np.minimum(m, 12)] + (leap & (m == 2))
+    bad |= (m < 1) | (m > 12) | (d < 1) | (d > month_days)
+    bad |= (hour > 23) | (minute > 59) | (second > 60)
+    invalid = int(np.count_nonzero(bad))
+    y -= m <= 2
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + np.where(m > 2, -3, 9)) + 2) // 5 + d - 1
+    days = era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+    out = days * 86400000
+    out += hour * 3600000
+    out += minute * 60000
+    out += second * 1000
+    out += number(20, 23)
+    return out, invalid
+
+
+def iso_to_epoch_ms(timestamps: pd.Series) -> np.ndarray:
+    r"""Convert the ISO 8601 timestamps with milliseconds (e.g.,
+    ``2014-04-07T10:51:09.277Z``) to the unix time in milliseconds. The raw
+    bytes of the timestamps are parsed by a parallel JIT-compiled kernel if
+    ``numba`` is installed, otherwise by the vectorized NumPy operations.
+
+    .. warning::
+        If any timestamp does not match the ``%Y-%m-%dT%H:%M:%S.%fZ`` format
+        with 3 fractional digits, an ``ValueError`` will be raised.
+
+    Args:
+        timestamps (pd.Series):
+            The ISO 8601 timestamps.
 
-def read_csv(
-    file_path: str,
-    delimiter: str,
-    sel_cols: list[int] | list[str] | None = None,
-    columns: list[str] | None = None,
-    types: list[Any] | None = None,
-    header: int | None = None,
-) -> pd.DataFrame:
-    r"""Read a CSV file and return a DataFrame. Only the columns specified in
-    ``select_cols`` will be read. The columns are renamed to the specified
-    names ``columns``, which should be a list of strings. Each column will be
-    converted to the specified type in ``types``. If ``types`` is ``None``,
-    the columns will be automatically inferred by Pandas. In addition, the
-    columns with blank values will be dropped.
+    Returns:
+        The unix timestamps in milliseconds.
+    """
+    buf = np.asarray(timestamps, dtype="S24").view(np.uint8).reshape(-1, 24)
+    if nb is not None:
+        epochs, invalid = _iso_to_epoch_ms_kernel(buf)
+    else:
+        epochs, invalid = _iso_to_epoch_ms_numpy(buf)
+    if invalid:
+        raise ValueError(
+            f"Found {invalid} timestamps not in the %Y-%m-%dT%H:%M:%S.%fZ format."
+        )
+    return epochs
+
+
+def read_range(file_path: str, start: int, end: int) -> pd.DataFrame:
+    r"""Parse the lines starting in the byte range ``[start, end)`` of a
+    YooChoose ``.dat`` file, and convert their timestamps to the unix time in
+    milliseconds (see :func:`iso_to_epoch_ms`). A line that is cut by ``start``
+    belongs to the previous range, so the ranges partitioning a file can be
+    parsed independently, e.g., in different processes.
 
     Args:
         file_path (str):
-            The path of the CSV file.
-        delimiter (str):
-            The delimiter of the CSV file.
-        select_cols (list[int] | list[str] | None, optional, default=None):
-            The columns to select from the CSV file. If ``None``, all columns
-            will be selected. The default value is ``None``.
-        columns (list[str] | None, optional, default=None):
-            The column names to rename the columns to. If ``None``, no renaming
-            will be performed. The default value is ``None``.
-        types (list[Any], optional, default=None):
-            The types to convert the columns to. If ``None``, the columns
-            will be automatically inferred by Pandas. The default value is
-            ``None``.
-        header (int | None, optional, default=None):
-            The row number to use as the column names. If ``None``, no row
-            will be used as the column names. The default value is ``None``.
+            The path of the ``.dat`` file.
+        start (int):
+            The start byte offset of the range.
+        end (int):
+            The end byte offset (exclusive) of the range.
 
     Returns:
-        The DataFrame containing the data from the CSV file.
+        The DataFrame of the interactions ``(UserID, ItemID, Timestamp)`` in
+        the range.
     """
-    df = pd.read_csv(
-        file_path,
-        sep=delimiter,
-        header=header,
-        usecols=sel_cols,
-        encoding="utf-8",
-        encoding_errors="replace",
-        engine="python",
-    )
-    if columns is not None:
-        df.columns = columns
-    if types is not None:
-        types = {col: typ for col, typ in zip(columns, types)}
-        df = df.astype(types)
-    df = df.dropna()
-    return df
+    if start == 0 and end >= os.path.getsize(file_path):
+        source = file_path
+    else:
+        with open_sequential(file_path) as f:
+            if start > 0:
+                # skip the rest of the line containing the byte before the range
+                f.seek(start - 1)
+                f.readline()
+            data = f.read(max(0, end - f.tell()))
+            if data and not data.endswith(b"\n"):
+                data += f.readline()
+        if not data.strip():
+            return pd.DataFrame(
+                {
+                    "UserID": np.empty(0, dtype=np.int32),
+                    "ItemID": np.empty(0, dtype=np.int32),
+                    "Timestamp": np.empty(0, dtype=np.int64),
+                }
+            )
+        source = io.BytesIO(data)
+
+    def parse(na_filter: bool) -> pd.DataFrame:
+        if not isinstance(source, str):
+            source.seek(0)
+        interactions = read_csv(
+            source,
+            delimiter=",",
+            columns=["UserID", "Timestamp", "ItemID"],
+            # the session and item IDs are all below 2^31
+            types=[np.int32, str, np.int32],
+            header=None,
+            # the buys and clicks files have different trailing columns
+            sel_cols=[0, 1, 2],
+            na_filter=na_filter,
+        )
+        # the columns are reordered without copying their data
+        return pd.DataFrame(
+            {
+                "UserID": interactions["UserID"].to_numpy(),
+                "ItemID": interactions["ItemID"].to_numpy(),
+                "Timestamp": iso_to_epoch_ms(interactions["Timestamp"]),
+            },
+            copy=False,
+        )
+
+    try:
+        # the blank IDs are handled by ``read_csv`` itself, while the blank
+        # timestamps are only rejected by ``iso_to_epoch_ms``, so the NA
+        # detection and dropping are skipped unless there are any
+        return parse(na_filter=False)
+    except ValueError:
+        return parse(na_filter=True)
 
 
 class YooChooseDatasetProcessor(BaseDatasetProcessor):
@@ -111,6 +316,16 @@ class YooChooseDatasetProcessor(BaseDatasetProcessor):
         """
         super().__init__(dataset_dir, False, k_core, sample_user_size)
 
+    def _raw_files(self) -> list[str]:
+        r"""Return the paths of the raw data files read by :meth:`_load_data`.
+
+        Returns:
+            list[str]:
+                The paths of the raw data files.
+        """
+        raw_dir = os.path.join(self.dataset_dir, "raw")
+        return [os.path.join(raw_dir, f"{self.dataset_name}.dat")]
+
     def _load_data(self) -> tuple[pd.DataFrame, None]:
         r"""Load the raw data from the raw data files. The following data
         are required to be loaded:
@@ -121,23 +336,92 @@ class YooChooseDatasetProcessor(BaseDatasetProcessor):
         - ``item2title`` (None):
             The item titles, which is ``None`` for the YooChoose dataset.
 
+        Returns:
+            tuple[pd.DataFrame, None]:
+                The first element is the user-item interaction data, and the
+                second element is the item titles (``None``).
+        """
+        if pa is not None:
+            return self._load_data_arrow()
+        data_path = os.path.join(self.dataset_dir, "raw", f"{self.dataset_name}.dat")
+        # the file is split into the byte ranges of about CHUNK_SIZE bytes, which
+        # are parsed in parallel (if more than one worker) and concatenated in
+        # the original order of the lines, so that the timestamp strings of only
+        # one range are alive in each process
+        file_size = os.path.getsize(data_path)
+        num_chunks = max(1, file_size // CHUNK_SIZE)
+        num_workers = min(os.cpu_count() or 1, num_chunks)
+        bounds = [file_size * i // num_chunks for i in range(num_chunks + 1)]
+        if num_chunks == 1:
+            interactions = read_range(data_path, 0, file_size)
+        elif num_workers == 1:
+            interactions = pd.concat(
+                map(read_range, itertools.repeat(data_path), bounds[:-1], bounds[1:]),
+                ignore_index=True,
+            )
+        else:
+            with ProcessPoolExecutor(
+                max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                interactions = pd.concat(
+                    executor.map(
+                        read_range,
+                        itertools.repeat(data_path),
+                        bounds[:-1],
+                        bounds[1:],
+                    ),
+                    ignore_index=True,
+                )
+        return interactions, None
+
+    def _load_data_arrow(self) -> tuple[pd.DataFrame, None]:
+        r"""Load the raw data in the same way as :meth:`_load_data`, but with
+        the streaming PyArrow CSV reader. The memory-mapped file is read as a
+        stream of record batches, and the timestamps are parsed by the ISO 8601
+        parser of Arrow while reading, so that no Python string objects are
+        created for them.
+
+        .. note::
+            This method requires the optional ``pyarrow`` package, and is used
+            by :meth:`_load_data` automatically if ``pyarrow`` is installed.
+            Compared with ``pa_csv.read_csv``, the streaming reader lowers the
+            peak memory by about a quarter at the same speed.
+
         Returns:
             tuple[pd.DataFrame, None]:
                 The first element is the user-item interaction data, and the
                 second element is the item titles (``None``).
         """
         raw_dir = os.path.join(self.dataset_dir, "raw")
-        interactions = read_csv(
-            os.path.join(raw_dir, f"{self.dataset_name}.dat"),
-            delimiter=",",
-            sel_cols=[0, 1, 2],
-            columns=["UserID", "Timestamp", "ItemID"],
-            types=[int, str, int],
-            header=None,
-        )
-        interactions["Timestamp"] = pd.to_datetime(
-            interactions["Timestamp"], format="%Y-%m-%dT%H:%M:%S.%fZ"
+        data_path = os.path.join(raw_dir, f"{self.dataset_name}.dat")
+        with pa.memory_map(data_path, "r") as source:
+            reader = pa_csv.open_csv(
+                source,
+                read_options=pa_csv.ReadOptions(
+                    use_threads=True,
+                    block_size=32 << 20,
+                    # the buys and clicks files have different trailing columns
+                    autogenerate_column_names=True,
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=["f0", "f1", "f2"],
+                    column_types={
+                        "f0": pa.int32(),
+                        # the "Z" suffix is only accepted for the UTC timestamps
+                        "f1": pa.timestamp("ms", tz="UTC"),
+                        "f2": pa.int32(),
+                    },
+                ),
+            )
+            table = pa.Table.from_batches(reader, schema=reader.schema)
+        table = table.drop_null()
+        interactions = pa.table(
+            {
+                "UserID": table["f0"],
+                "ItemID": table["f2"],
+                "Timestamp": table["f1"].cast(pa.int64()),
+            }
         )
-        interactions["Timestamp"] = interactions["Timestamp"].astype("int64") // 10**6
-        interactions = interactions[["UserID", "ItemID", "Timestamp"]]
+        del table
+        interactions = interactions.to_pandas(split_blocks=True, self_destruct=True)
         return interactions, None